@@ -0,0 +1,151 @@
+"""
+Microbenchmark: per-record cost of parsing KEY: VALUE blocks
+
+Writes a synthetic item file and a synthetic quest file (100k records each
+by default) and times the original approach (collect stripped lines per
+block, then split/strip/lower them) against the shared single-pass
+tokenizer in game_data, which builds records while reading the file.
+
+Usage: python benchmarks/bench_block_parser.py [record_count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from custom_exceptions import InvalidDataFormatError
+
+# ============================================================================
+# ORIGINAL PARSERS (for comparison)
+# ============================================================================
+
+def legacy_parse_quest_block(lines):
+    """parse_quest_block as it was before the shared tokenizer"""
+    quest = {}
+    for line in lines:
+        if ":" not in line:
+            raise InvalidDataFormatError("Quest line missing ':' seperator")
+        key, value = line.split(":", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        quest[key] = value
+    try:
+        quest["reward_xp"] = int(quest["reward_xp"])
+        quest["reward_gold"] = int(quest["reward_gold"])
+        quest["required_level"] = int(quest["required_level"])
+    except Exception:
+        raise InvalidDataFormatError("Quest numeric field is invalid")
+    return quest
+
+
+def legacy_parse_item_block(lines):
+    """parse_item_block as it was before the shared tokenizer"""
+    item = {}
+    for line in lines:
+        if ": " not in line:
+            raise InvalidDataFormatError("Item line missing ': ' separator")
+        key, value = line.split(": ", 1)
+        key = key.strip().lower()
+        value = value.strip()
+        item[key] = value
+    try:
+        item["cost"] = int(item["cost"])
+    except Exception:
+        raise InvalidDataFormatError("Item cost must be an integer")
+    return item
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+
+def write_synthetic_items(path, count):
+    """Write count item blocks to path"""
+    types = ["weapon", "armor", "consumable"]
+    stats = ["strength", "magic", "max_health", "health"]
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(
+                f"ITEM_ID: item_{i}\n"
+                f"NAME: Item {i}\n"
+                f"TYPE: {types[i % 3]}\n"
+                f"EFFECT: {stats[i % 4]}:{i % 50 + 1}\n"
+                f"COST: {i % 1000}\n"
+                f"DESCRIPTION: Synthetic item number {i}\n\n"
+            )
+
+
+def write_synthetic_quests(path, count):
+    """Write count quest blocks to path"""
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(
+                f"QUEST_ID: quest_{i}\n"
+                f"TITLE: Quest {i}\n"
+                f"DESCRIPTION: Synthetic quest number {i}\n"
+                f"REWARD_XP: {i % 500}\n"
+                f"REWARD_GOLD: {i % 300}\n"
+                f"REQUIRED_LEVEL: {i % 20 + 1}\n"
+                f"PREREQUISITE: NONE\n\n"
+            )
+
+
+def legacy_records(path, parser):
+    """Original pipeline: stripped block lists, then one parse per block"""
+    for start, block in game_data._iter_blocks(path, path, path):
+        yield parser(block)
+
+
+def tokenizer_records(path, field_table, block_format):
+    """New pipeline: records built directly from the file handle"""
+    for start, record in game_data._iter_records(path, field_table, block_format, path, path):
+        yield record
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def time_pipeline(make_records, count, repeat=3):
+    """Return the best per-record time in microseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for record in make_records():
+            pass
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / count * 1_000_000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        item_path = os.path.join(temp_dir, "items.txt")
+        quest_path = os.path.join(temp_dir, "quests.txt")
+        write_synthetic_items(item_path, count)
+        write_synthetic_quests(quest_path, count)
+
+        print(f"=== BLOCK PARSER BENCHMARK ({count} records) ===")
+        for label, path, legacy_parser, field_table, block_format in [
+            ("items", item_path, legacy_parse_item_block,
+             game_data.ITEM_FIELD_TABLE, game_data.ITEM_FORMAT),
+            ("quests", quest_path, legacy_parse_quest_block,
+             game_data.QUEST_FIELD_TABLE, game_data.QUEST_FORMAT),
+        ]:
+            before = lambda: legacy_records(path, legacy_parser)
+            after = lambda: tokenizer_records(path, field_table, block_format)
+            assert list(before()) == list(after())
+
+            old_cost = time_pipeline(before, count)
+            new_cost = time_pipeline(after, count)
+            print(f"{label:7s} before: {old_cost:.2f} us/record  "
+                  f"after: {new_cost:.2f} us/record  ({old_cost / new_cost:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
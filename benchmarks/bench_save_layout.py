@@ -0,0 +1,93 @@
+"""
+Benchmark: flat vs sharded save directories
+
+For each directory size, fills a flat save directory with that many small
+save files, migrates a copy to the sharded layout, and times the file
+operations save/load depend on: exists checks, opening and reading a save,
+and creating a new save, for random names. Also times migration itself.
+
+Usage: python benchmarks/bench_save_layout.py [size1,size2,...]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+# ============================================================================
+# SYNTHETIC SAVES
+# ============================================================================
+
+def write_flat_saves(save_directory, count):
+    """Write count save files straight into save_directory"""
+    os.makedirs(save_directory)
+    data = character_manager.encode_character_save(
+        character_manager.create_character("Template", "Warrior"))
+    for i in range(count):
+        with open(os.path.join(save_directory, f"hero_{i}_save.txt"), "wb") as f:
+            f.write(data)
+    return data
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def time_operations(save_directory, names, data):
+    """Return microseconds per exists, open+read and create for names"""
+    paths = [character_manager.get_save_path(name, save_directory) for name in names]
+
+    start = time.perf_counter()
+    for path in paths:
+        os.path.exists(path)
+    exists_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for path in paths:
+        with open(path, "rb") as f:
+            f.read()
+    read_cost = time.perf_counter() - start
+
+    new_paths = [character_manager.get_save_path(f"new_{name}", save_directory) for name in names]
+    start = time.perf_counter()
+    for path in new_paths:
+        character_manager._make_shard_directory(path)
+        with open(path, "wb") as f:
+            f.write(data)
+    create_cost = time.perf_counter() - start
+
+    scale = 1_000_000 / len(names)
+    return exists_cost * scale, read_cost * scale, create_cost * scale
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(",")] if len(sys.argv) > 1 else [1_000, 10_000, 100_000]
+    rng = random.Random(163)
+
+    print("=== SAVE LAYOUT BENCHMARK (us per operation) ===")
+    print(f"{'files':>8s} {'layout':8s} {'exists':>8s} {'read':>8s} {'create':>8s}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            flat_dir = os.path.join(temp_dir, "flat")
+            sharded_dir = os.path.join(temp_dir, "sharded")
+            data = write_flat_saves(flat_dir, size)
+            shutil.copytree(flat_dir, sharded_dir)
+
+            start = time.perf_counter()
+            character_manager.migrate_save_directory(sharded_dir)
+            migrate_seconds = time.perf_counter() - start
+
+            names = [f"hero_{rng.randrange(size)}" for _ in range(min(size, 2_000))]
+            for label, directory in [("flat", flat_dir), ("sharded", sharded_dir)]:
+                exists_cost, read_cost, create_cost = time_operations(directory, names, data)
+                print(f"{size:8d} {label:8s} {exists_cost:8.2f} {read_cost:8.2f} {create_cost:8.2f}")
+            print(f"{size:8d} migration took {migrate_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
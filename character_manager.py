@@ -10,13 +10,135 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import json
+import hashlib
+import inspect
+import math
+import struct
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from contextlib import ExitStack, contextmanager
 from custom_exceptions import (
+    GameError,
     InvalidCharacterClassError,
     CharacterNotFoundError,
     SaveFileCorruptedError,
     InvalidSaveDataError,
+    SaveLockTimeoutError,
     CharacterDeadError
 )
+from inventory_system import Inventory
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # no advisory locks on this platform (e.g. Windows)
+
+# Save formats understood by save_character/load_character
+SAVE_FORMATS = ("text", "binary")
+DEFAULT_SAVE_FORMAT = "text"
+
+# ============================================================================
+# CHARACTER TYPE
+# ============================================================================
+
+# Dictionary key -> attribute name for every core character field
+# ("class" is a Python keyword, so its attribute is character_class)
+CHARACTER_FIELDS = {
+    "name": "name",
+    "class": "character_class",
+    "level": "level",
+    "health": "health",
+    "max_health": "max_health",
+    "strength": "strength",
+    "magic": "magic",
+    "experience": "experience",
+    "gold": "gold",
+    "inventory": "inventory",
+    "active_quests": "active_quests",
+    "completed_quests": "completed_quests"
+}
+
+class Character(MutableMapping):
+    """
+    Character data stored in __slots__ instead of a per-object dict
+
+    It still behaves like the character dictionaries the rest of the game
+    uses: character["gold"] += 10, "equipped_weapon" in character,
+    character.get(...), dict(character) and == against a dict all work.
+    Core fields can also be read as attributes (character.gold), which is
+    faster. character["inventory"] is always an inventory_system.Inventory
+    (lists assigned to it are converted). Any other key (equipped_weapon,
+    stat_layers, ...) is kept in a small side dictionary that is only
+    created when first needed.
+    """
+
+    __slots__ = tuple(CHARACTER_FIELDS.values()) + ("_extra",)
+
+    def __init__(self, data=None, **fields):
+        self._extra = None
+        for key, value in dict(data or {}, **fields).items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        attribute = CHARACTER_FIELDS.get(key)
+        if attribute is not None:
+            try:
+                return getattr(self, attribute)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        attribute = CHARACTER_FIELDS.get(key)
+        if attribute is not None:
+            if attribute == "inventory" and not isinstance(value, Inventory):
+                value = Inventory(value)
+            setattr(self, attribute, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        attribute = CHARACTER_FIELDS.get(key)
+        if attribute is not None:
+            try:
+                delattr(self, attribute)
+            except AttributeError:
+                raise KeyError(key)
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        attribute = CHARACTER_FIELDS.get(key)
+        if attribute is not None:
+            return hasattr(self, attribute)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key, attribute in CHARACTER_FIELDS.items():
+            if hasattr(self, attribute):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        count = sum(1 for attribute in CHARACTER_FIELDS.values() if hasattr(self, attribute))
+        return count + (len(self._extra) if self._extra is not None else 0)
+
+    def copy(self):
+        """Shallow copy, like dict.copy()"""
+        return Character(self)
+
+    def __repr__(self):
+        return f"Character({dict(self)!r})"
 
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
@@ -28,7 +150,7 @@ def create_character(name, character_class):
     
     Valid classes: Warrior, Mage, Rogue, Cleric
     
-    Returns: Dictionary with character data including:
+    Returns: Character (dictionary-compatible) with data including:
             - name, class, level, health, max_health, strength, magic
             - experience, gold, inventory, active_quests, completed_quests
     
@@ -48,8 +170,8 @@ def create_character(name, character_class):
     #Gets the base stats for the chosen class
     base_stats = valid_classes[character_class]
 
-# Creates the character dictionary with initial stats
-    character = {
+# Creates the character with initial stats
+    character = Character({
         "name": name,
         "class": character_class,
         "level": 1,
@@ -62,17 +184,20 @@ def create_character(name, character_class):
         "inventory": [],
         "active_quests": [],
         "completed_quests": []
-    }
+    })
 
     return character
 
 
 
-def save_character(character, save_directory="data/save_games"):
+def save_character(character, save_directory="data/save_games", save_format=DEFAULT_SAVE_FORMAT):
     """
     Save character to file
     
     Filename format: {character_name}_save.txt
+
+    save_format is "text" (below) or "binary" (compact format, see
+    format_character_binary). load_character detects the format itself.
     
     File format:
     NAME: character_name
@@ -89,48 +214,256 @@ def save_character(character, save_directory="data/save_games"):
     COMPLETED_QUESTS: quest1,quest2
     
     Returns: True if successful
-    Raises: PermissionError, IOError (let them propagate or handle)
+    Raises: SaveFileCorruptedError if the file could not be written
+            SaveLockTimeoutError if another process holds the save too long
     """
     #creates save directory if it doesn't exist
     if not os.path.exists(save_directory):
         os.makedirs(save_directory)
 
 #builds the filename and path
-    filename = f"{character['name']}_save.txt"
-    file_path = os.path.join(save_directory, filename)
+    file_path = get_save_path(character['name'], save_directory)
+
+    with save_file_lock(character['name'], save_directory):
+        try:
+            _make_shard_directory(file_path)
+            # Whole file is built as one buffer and swapped in atomically, so a
+            # crash mid-save leaves the previous save intact
+            data = encode_character_save(character, save_format)
+            write_file_atomic(file_path, data)
+            _snapshot_written(file_path, character, data)
+            update_save_manifest(save_directory, {character['name']: _manifest_entry(character, data)})
+            return True
+
+        #handles file and IO errors
+        except Exception as e:
+            raise SaveFileCorruptedError(f"Error saving character: {e}")
+
+def save_characters(characters, save_directory="data/save_games", save_format=DEFAULT_SAVE_FORMAT):
+    """
+    Save many characters as one group commit
+
+    All save files are written to temporary files first, synced to disk,
+    and only then moved into place, followed by a single directory sync
+    (one per shard directory touched, for sharded layouts).
+    This is much cheaper than calling save_character in a loop when an
+    autosave wants to flush lots of characters at once.
+
+    If the same name appears more than once, the last character with
+    that name is the one saved (like SaveBatch).
+
+    Returns: Number of save files written
+    Raises: SaveFileCorruptedError if any file could not be written
+            (no save file is replaced in that case)
+            SaveLockTimeoutError if a save stays locked too long
+    """
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+
+    # One file per name: two entries sharing a temp path would break the
+    # all-or-nothing replace below
+    characters = list({character['name']: character for character in characters}.values())
+    pending = []
+    entries = {}
+    snapshots = []
+    with ExitStack() as locks:
+        # At most LOCK_STRIPES locks however big the batch is, always taken
+        # in the same order so two batches can't deadlock
+        for lock_path in sorted({get_lock_path(save_directory, character['name'])
+                                 for character in characters}):
+            locks.enter_context(_hold_lock(lock_path, True, None))
+
+        try:
+            for character in characters:
+                file_path = get_save_path(character['name'], save_directory)
+                _make_shard_directory(file_path)
+                temp_path = _temp_path(file_path)
+                pending.append((temp_path, file_path))
+                data = encode_character_save(character, save_format)
+                _write_and_sync(temp_path, data)
+                entries[character['name']] = _manifest_entry(character, data)
+                snapshots.append((file_path, character, data))
+
+            for temp_path, file_path in pending:
+                os.replace(temp_path, file_path)
+            for directory in {os.path.dirname(file_path) for temp_path, file_path in pending}:
+                _sync_directory(directory)
+
+            for file_path, character, data in snapshots:
+                _snapshot_written(file_path, character, data)
+            update_save_manifest(save_directory, entries)
+
+        except Exception as e:
+            for temp_path, file_path in pending:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            raise SaveFileCorruptedError(f"Error saving characters: {e}")
+
+    return len(pending)
+
+class SaveBatch:
+    """
+    Collects dirty characters and saves them together
+
+    Usage:
+        autosave = SaveBatch(max_pending=500)
+        autosave.mark_dirty(character)   # cheap, may trigger a flush
+        autosave.flush()                 # one group commit for everything
+    """
+
+    def __init__(self, save_directory="data/save_games", max_pending=None,
+                 save_format=DEFAULT_SAVE_FORMAT):
+        """max_pending: flush automatically once this many are waiting"""
+        self.save_directory = save_directory
+        self.max_pending = max_pending
+        self.save_format = save_format
+        self.pending = {}
+
+    def mark_dirty(self, character):
+        """Queue a character to be saved on the next flush"""
+        # Keyed by name so repeated changes to one hero are saved once
+        self.pending[character['name']] = character
+        if self.max_pending is not None and len(self.pending) >= self.max_pending:
+            self.flush()
+
+    def flush(self):
+        """
+        Save every queued character in one group commit
+
+        Returns: Number of characters saved
+        """
+        if not self.pending:
+            return 0
+        saved = save_characters(list(self.pending.values()), self.save_directory, self.save_format)
+        self.pending.clear()
+        return saved
+
+def format_character_save(character):
+    """
+    Build the text save file for a character as a single string
+
+    Returns: String in the format described in save_character
+    """
+    character = character_as_saved(character)
+
+    # Lists are saved as comma-separated values
+    return (
+        f"NAME: {character['name']}\n"
+        f"CLASS: {character['class']}\n"
+        f"LEVEL: {character['level']}\n"
+        f"HEALTH: {character['health']}\n"
+        f"MAX_HEALTH: {character['max_health']}\n"
+        f"STRENGTH: {character['strength']}\n"
+        f"MAGIC: {character['magic']}\n"
+        f"EXPERIENCE: {character['experience']}\n"
+        f"GOLD: {character['gold']}\n"
+        f"INVENTORY: {','.join(character['inventory'])}\n"
+        f"ACTIVE_QUESTS: {','.join(character['active_quests'])}\n"
+        f"COMPLETED_QUESTS: {','.join(character['completed_quests'])}\n"
+    )
+
+# Keys of the items a character has equipped (see inventory_system._equip)
+EQUIPPED_FIELDS = ("equipped_weapon", "equipped_armor")
+
+def character_as_saved(character):
+    """
+    The character as it should be saved: base stats, without the
+    equipment and buff layers (see inventory_system.StatLayers) that are
+    folded into its strength/magic/max_health fields
+
+    Equipping moves an item out of the inventory, and the save format has
+    no equipment slots, so equipped items are saved back in the inventory
+    (unequipped) instead of being lost.
+
+    Returns: The character itself if nothing is layered or equipped,
+             otherwise a dictionary copy with the bonuses taken off and the
+             equipped items added to its inventory list
+    """
+    layers = character.get("stat_layers")
+    has_bonus = layers is not None and (any(layers.totals.values()) or layers.instant_health())
+    equipped = [character[field] for field in EQUIPPED_FIELDS if character.get(field) is not None]
+    if not has_bonus and not equipped:
+        return character
+
+    base = dict(character)
+    if has_bonus:
+        for stat_name, bonus in layers.totals.items():
+            base[stat_name] -= bonus
+        # Health a layer added goes away with it, as on unequip
+        base["health"] = layers.take_back_health(base["health"], layers.instant_health())
+        base["health"] = min(base["health"], base["max_health"])
+    if equipped:
+        base["inventory"] = list(character["inventory"]) + equipped
+    return base
+
+def encode_character_save(character, save_format=DEFAULT_SAVE_FORMAT):
+    """
+    Encode a character in the requested save format
 
+    Returns: bytes ready to be written to the save file
+    Raises: ValueError if save_format is unknown
+    """
+    if save_format == "text":
+        return format_character_save(character).encode("utf-8")
+    if save_format == "binary":
+        return format_character_binary(character)
+    raise ValueError(f"Unknown save format: {save_format}")
+
+def get_save_path(character_name, save_directory="data/save_games"):
+    """
+    Return the path of a character's save file
+
+    In a sharded save directory (see SAVE LAYOUT below) the file lives in
+    two levels of hash-prefix folders, e.g. save_games/3f/a2/Aria_save.txt.
+    """
+    filename = f"{character_name}_save.txt"
+    if get_save_layout(save_directory) == "sharded":
+        return os.path.join(save_directory, *get_shard(character_name), filename)
+    return os.path.join(save_directory, filename)
+
+def write_file_atomic(file_path, data):
+    """
+    Replace file_path with data (str or bytes) without ever exposing a
+    partial file
+
+    The data goes to a temporary file in the same directory, is flushed
+    and fsynced, then os.replace'd over the old file.
+    """
+    temp_path = _temp_path(file_path)
     try:
-        with open(file_path, "w") as file:
-            file.write(f"NAME: {character['name']}\n")
-            file.write(f"CLASS: {character['class']}\n")
-            file.write(f"LEVEL: {character['level']}\n")
-            file.write(f"HEALTH: {character['health']}\n")
-            file.write(f"MAX_HEALTH: {character['max_health']}\n")
-            file.write(f"STRENGTH: {character['strength']}\n")
-            file.write(f"MAGIC: {character['magic']}\n")
-            file.write(f"EXPERIENCE: {character['experience']}\n")
-            file.write(f"GOLD: {character['gold']}\n")
-
-            # Joins inventory list into comma-separated string
-            inventory_str = ",".join(character['inventory'])
-            file.write(f"INVENTORY: {inventory_str}\n")
-
-            # Joins active quests list into comma-separated string
-            active_quests_str = ",".join(character['active_quests'])
-            file.write(f"ACTIVE_QUESTS: {active_quests_str}\n")
-
-            # Joins completed quests list into comma-separated string
-            completed_quests_str = ",".join(character['completed_quests'])
-            file.write(f"COMPLETED_QUESTS: {completed_quests_str}\n")
-        return True
-    
-    #handles file and IO errors
-    except Exception as e:
-        raise SaveFileCorruptedError(f"Error saving character: {e}")
-    # TODO: Implement save functionality
-    # Create save_directory if it doesn't exist
-    # Handle any file I/O errors appropriately
-    # Lists should be saved as comma-separated values
+        _write_and_sync(temp_path, data)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _sync_directory(os.path.dirname(file_path))
+
+def _temp_path(file_path):
+    """Temporary file used while writing file_path"""
+    return f"{file_path}.{os.getpid()}.tmp"
+
+def _write_and_sync(file_path, data):
+    """Write data (str or bytes) to file_path and make sure it reached the disk"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with open(file_path, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+def _sync_directory(directory):
+    """fsync a directory so renames inside it survive a crash"""
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 def load_character(character_name, save_directory="data/save_games"):
     """
@@ -145,27 +478,70 @@ def load_character(character_name, save_directory="data/save_games"):
         CharacterNotFoundError if save file doesn't exist
         SaveFileCorruptedError if file exists but can't be read
         InvalidSaveDataError if data format is wrong
+        SaveLockTimeoutError if another process is writing the save too long
     """
         # Build file path
-    filename = f"{character_name}_save.txt"
-    file_path = os.path.join(save_directory, filename)
+    file_path = get_save_path(character_name, save_directory)
 
     #Check if file exists
     if not os.path.exists(file_path):
         raise CharacterNotFoundError(f"No save file found for {character_name}")
 
+    #Shared lock: other readers are fine, writers wait until we're done
+    with save_file_lock(character_name, save_directory, exclusive=False):
+        character, data, applied, clean = _read_character_file(file_path, character_name)
+    return character
+
+def _read_character_file(file_path, character_name):
+    """
+    Read a save file and replay its journal (caller holds the lock)
+
+    Returns: (character, snapshot_data, changes_applied, clean), see
+             _replay_journal
+    """
     #Try to read the file
     try:
-        with open(file_path, "r") as f:
-            lines = f.readlines()
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        # Deleted while we waited for the lock
+        raise CharacterNotFoundError(f"No save file found for {character_name}")
     except Exception as e:
         raise SaveFileCorruptedError(f"Could not read save file: {e}")
 
+    character = Character(decode_character_save(data))
+
+    #Apply any incremental changes saved after this snapshot
+    applied, clean = _replay_journal(file_path, character, data)
+    return character, data, applied, clean
+
+def decode_character_save(data):
+    """
+    Decode save file bytes, detecting text or binary format
+
+    Returns: Character dictionary
+    Raises: InvalidSaveDataError if data format is wrong
+    """
+    if data.startswith(BINARY_SAVE_MAGIC):
+        return parse_character_binary(data)
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        raise InvalidSaveDataError("Save file has invalid data")
+    return parse_character_save(text)
+
+def parse_character_save(text):
+    """
+    Parse the text save format (see save_character) into a character
+
+    Returns: Character dictionary
+    Raises: InvalidSaveDataError if data format is wrong
+    """
     character = {}
 
     #Parse each line into key/value pairs
     try:
-        for line in lines:
+        for line in text.splitlines():
             line = line.strip()
 
             if line == "":
@@ -224,16 +600,16 @@ def list_saved_characters(save_directory="data/save_games"):
     if not os.path.exists(save_directory):
         return []
 
-    characters = []
+#The manifest already lists every save, no need to scan the directory
+    manifest = read_save_manifest(save_directory)
+    if manifest is not None:
+        return list(manifest)
 
-#Loop through all files in directory
-    for filename in os.listdir(save_directory):
+    characters = []
 
-#Only include files that end with _save.txt
-        if filename.endswith("_save.txt"):
-            # Remove the suffix to get just the name
-            character_name = filename.replace("_save.txt", "")
-            characters.append(character_name)
+#Loop through all save files (in every shard folder if sharded)
+    for character_name, file_path in iter_save_files(save_directory):
+        characters.append(character_name)
 
     return characters
 
@@ -249,23 +625,968 @@ def delete_character(character_name, save_directory="data/save_games"):
     Raises: CharacterNotFoundError if character doesn't exist
     """
 #Build the save file path
-    filename = f"{character_name}_save.txt"
-    file_path = os.path.join(save_directory, filename)
+    file_path = get_save_path(character_name, save_directory)
 
 #Check if file exists
     if not os.path.exists(file_path):
         raise CharacterNotFoundError(f"No save file found for {character_name}")
 
-    try:
-        os.remove(file_path)
-        return True
-
-    except Exception:
+    with save_file_lock(character_name, save_directory):
+        try:
+            os.remove(file_path)
+            _forget_saved(file_path)
+            if os.path.exists(file_path + LEGACY_LOCK_SUFFIX):
+                os.remove(file_path + LEGACY_LOCK_SUFFIX)
+        except FileNotFoundError:
+            # Another process deleted it while we waited for the lock
+            raise CharacterNotFoundError(f"No save file found for {character_name}")
+        except Exception:
 #Rare: file exists but cannot be deleted (permissions etc.)
-        raise SaveFileCorruptedError(f"Could not delete save file for {character_name}")
+            raise SaveFileCorruptedError(f"Could not delete save file for {character_name}")
+
+    update_save_manifest(save_directory, removals=[character_name])
+    return True
     # TODO: Implement character deletion
     # Verify file exists before attempting deletion
 
+# ============================================================================
+# SAVE LAYOUT
+# ============================================================================
+
+# A save directory is either "flat" (every {name}_save.txt side by side, the
+# original layout) or "sharded": each save goes in
+# {first 2 hex digits}/{next 2 hex digits}/ of the SHA-256 of the name, so
+# no single folder grows past a few dozen files even with millions of
+# characters. A sharded directory is marked by a small layout file, written
+# by migrate_save_directory.
+SAVE_LAYOUTS = ("flat", "sharded")
+LAYOUT_FILENAME = "save_layout.json"
+
+# {absolute save directory: layout}, so get_save_path doesn't stat the
+# layout file on every call
+_save_layouts = {}
+
+def get_shard(character_name):
+    """Return the two shard folder names for a character, e.g. ("3f", "a2")"""
+    digest = hashlib.sha256(character_name.encode("utf-8")).hexdigest()
+    return digest[:2], digest[2:4]
+
+def get_save_layout(save_directory="data/save_games"):
+    """Return "flat" or "sharded" for a save directory"""
+    key = os.path.abspath(save_directory)
+    layout = _save_layouts.get(key)
+    if layout is None:
+        layout = "flat"
+        try:
+            with open(os.path.join(save_directory, LAYOUT_FILENAME), "r") as f:
+                if json.load(f).get("layout") == "sharded":
+                    layout = "sharded"
+        except (OSError, ValueError, AttributeError):
+            pass
+        _save_layouts[key] = layout
+    return layout
+
+def _make_shard_directory(file_path):
+    """Create the folder a save file goes in (a no-op for flat layouts)"""
+    directory = os.path.dirname(file_path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+
+def iter_save_files(save_directory="data/save_games"):
+    """
+    Yield (character_name, file_path) for every save file in a directory,
+    whichever layout it uses
+    """
+    if get_save_layout(save_directory) == "sharded":
+        folders = []
+        for first in sorted(os.listdir(save_directory)):
+            first_path = os.path.join(save_directory, first)
+            if len(first) == 2 and os.path.isdir(first_path):
+                folders.extend(os.path.join(first_path, second) for second in sorted(os.listdir(first_path)))
+    else:
+        folders = [save_directory]
+
+    for folder in folders:
+        for filename in os.listdir(folder):
+            if filename.endswith("_save.txt"):
+                yield filename[:-len("_save.txt")], os.path.join(folder, filename)
+
+def migrate_save_directory(save_directory="data/save_games", layout="sharded"):
+    """
+    Move every save (and its journal) into the given layout
+
+    Run it while nothing else is using the directory. Files are moved
+    before the layout file is written, so an interrupted migration can
+    simply be run again. Leftover per-save lock files from older versions
+    are removed on the way.
+
+    Returns: Number of save files moved
+    Raises: ValueError for an unknown layout
+    """
+    if layout not in SAVE_LAYOUTS:
+        raise ValueError(f"Unknown save layout: {layout}")
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+
+    # Look in both layouts, in case an earlier run was interrupted
+    found = {}
+    for old_layout in SAVE_LAYOUTS:
+        _save_layouts[os.path.abspath(save_directory)] = old_layout
+        for name, file_path in iter_save_files(save_directory):
+            found[file_path] = name
+
+    _save_layouts[os.path.abspath(save_directory)] = layout
+    moved = 0
+    for old_path, name in found.items():
+        new_path = get_save_path(name, save_directory)
+        if old_path == new_path:
+            continue
+        _make_shard_directory(new_path)
+        for suffix in ("", JOURNAL_SUFFIX):
+            if os.path.exists(old_path + suffix):
+                os.replace(old_path + suffix, new_path + suffix)
+        state = _saved_state.pop(os.path.abspath(old_path), None)
+        if state is not None:
+            _saved_state[os.path.abspath(new_path)] = state
+        moved += 1
+
+    # Nobody else is using the directory, so old per-save locks can go
+    for folder, subfolders, filenames in os.walk(save_directory):
+        if LOCK_DIRNAME in subfolders:
+            subfolders.remove(LOCK_DIRNAME)
+        for filename in filenames:
+            if filename.endswith(LEGACY_LOCK_SUFFIX):
+                os.remove(os.path.join(folder, filename))
+
+    layout_path = os.path.join(save_directory, LAYOUT_FILENAME)
+    if layout == "sharded":
+        write_file_atomic(layout_path, json.dumps({"layout": "sharded"}))
+    elif os.path.exists(layout_path):
+        os.remove(layout_path)
+    return moved
+
+# ============================================================================
+# FILE LOCKING
+# ============================================================================
+
+# Several processes may share one save directory. Saves are guarded by a
+# fixed set of LOCK_STRIPES lock files in {save_directory}/.locks/, picked
+# by a hash of the character name, plus one lock for the manifest. They
+# are flock'ed around reads (shared) and writes (exclusive). The lock files
+# are separate because saves are replaced with os.replace, which swaps out
+# the save file's inode. Striping keeps the number of lock files (and the
+# descriptors a big save_characters batch holds) bounded, and nothing is
+# left behind when a character is deleted.
+LOCK_DIRNAME = ".locks"
+LOCK_STRIPES = 64
+MANIFEST_LOCK_FILENAME = "manifest.lock"
+
+# Older versions kept a {file}.lock next to every save; delete_character
+# and migrate_save_directory clean those up
+LEGACY_LOCK_SUFFIX = ".lock"
+
+# Seconds to wait for another process before giving up
+SAVE_LOCK_TIMEOUT = 10.0
+_LOCK_RETRY_DELAY = 0.002
+_LOCK_MAX_RETRY_DELAY = 0.05
+
+# How long we've waited for locks, see get_lock_stats()
+_lock_stats = {
+    "acquired": 0,
+    "contended": 0,
+    "timeouts": 0,
+    "wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+}
+
+# Locks this thread already holds: {lock_path: [fd, exclusive]}.
+# flock would deadlock on a second lock of the same file from the same
+# process, so nested calls (e.g. an incremental save falling back to a full
+# save, or two characters that share a stripe) reuse the outer lock instead.
+_held_locks = threading.local()
+
+def get_lock_stats():
+    """
+    Returns: Dictionary with acquired, contended (had to wait), timeouts,
+             wait_seconds (total) and max_wait_seconds
+    """
+    return dict(_lock_stats)
+
+def reset_lock_stats():
+    """Zero the lock wait counters"""
+    for key in _lock_stats:
+        _lock_stats[key] = 0.0 if key.endswith("seconds") else 0
+
+def _acquire_lock(fd, exclusive, timeout, lock_path):
+    """flock fd, polling until it's free or timeout seconds have passed"""
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    try:
+        fcntl.flock(fd, mode | fcntl.LOCK_NB)
+        _lock_stats["acquired"] += 1
+        return
+    except BlockingIOError:
+        pass
+
+    _lock_stats["contended"] += 1
+    start = time.monotonic()
+    delay = _LOCK_RETRY_DELAY
+    while True:
+        waited = time.monotonic() - start
+        if waited >= timeout:
+            _lock_stats["timeouts"] += 1
+            _lock_stats["wait_seconds"] += waited
+            raise SaveLockTimeoutError(f"Timed out after {waited:.1f}s waiting for {lock_path}")
+        time.sleep(min(delay, timeout - waited))
+        delay = min(delay * 2, _LOCK_MAX_RETRY_DELAY)
+        try:
+            fcntl.flock(fd, mode | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            continue
+
+    waited = time.monotonic() - start
+    _lock_stats["acquired"] += 1
+    _lock_stats["wait_seconds"] += waited
+    _lock_stats["max_wait_seconds"] = max(_lock_stats["max_wait_seconds"], waited)
+
+def get_lock_path(save_directory="data/save_games", character_name=None):
+    """
+    Return the lock file guarding a character's save (its stripe), or the
+    manifest lock if character_name is None
+    """
+    if character_name is None:
+        filename = MANIFEST_LOCK_FILENAME
+    else:
+        digest = hashlib.sha256(character_name.encode("utf-8")).hexdigest()
+        filename = f"stripe_{int(digest[:8], 16) % LOCK_STRIPES:02d}.lock"
+    return os.path.join(save_directory, LOCK_DIRNAME, filename)
+
+def save_file_lock(character_name, save_directory="data/save_games", exclusive=True, timeout=None):
+    """
+    Hold an advisory lock on a character's save for the duration of a
+    with block
+
+    Args:
+        character_name: Character whose save (and journal) to lock
+        save_directory: Directory containing save files
+        exclusive: True for writers, False for readers (many readers can
+                   hold the lock at once)
+        timeout: Seconds to wait, default SAVE_LOCK_TIMEOUT
+
+    Raises: SaveLockTimeoutError if the lock isn't free in time
+            SaveFileCorruptedError if the lock file can't be opened
+    """
+    return _hold_lock(get_lock_path(save_directory, character_name), exclusive, timeout)
+
+def _manifest_lock(save_directory, exclusive=True):
+    """Lock the save manifest (see save_file_lock)"""
+    return _hold_lock(get_lock_path(save_directory), exclusive, None)
+
+def _open_lock_file(lock_path, exclusive):
+    """
+    Open (creating if needed) a lock file and return its descriptor
+
+    Readers don't need to create anything: in a save directory they can't
+    write to, they use an existing lock file read-only, or no lock at all
+    if there is none (nobody can be writing there either).
+
+    Returns: File descriptor, or None if a reader should go without a lock
+    Raises: SaveFileCorruptedError if a writer can't open the lock file
+    """
+    try:
+        try:
+            return os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            return os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError as e:
+        if exclusive:
+            raise SaveFileCorruptedError(f"Could not open lock file {lock_path}: {e}")
+
+    try:
+        return os.open(lock_path, os.O_RDONLY)
+    except OSError:
+        return None
+
+@contextmanager
+def _hold_lock(lock_path, exclusive, timeout):
+    """flock lock_path for a with block, reusing a lock this thread holds"""
+    if fcntl is None:
+        yield
+        return
+
+    if timeout is None:
+        timeout = SAVE_LOCK_TIMEOUT
+    lock_path = os.path.abspath(lock_path)
+    held = getattr(_held_locks, "locks", None)
+    if held is None:
+        held = _held_locks.locks = {}
+
+    if lock_path in held:
+        fd, held_exclusive = held[lock_path]
+        if exclusive and not held_exclusive:
+            # Upgrade a read lock we already hold to a write lock
+            _acquire_lock(fd, True, timeout, lock_path)
+            held[lock_path][1] = True
+        yield
+        return
+
+    fd = _open_lock_file(lock_path, exclusive)
+    if fd is None:
+        yield
+        return
+    try:
+        _acquire_lock(fd, exclusive, timeout, lock_path)
+        held[lock_path] = [fd, exclusive]
+        try:
+            yield
+        finally:
+            del held[lock_path]
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+# ============================================================================
+# BINARY SAVE FORMAT
+# ============================================================================
+
+# Layout (all integers little-endian):
+#   magic "QCSB" + format version (1 byte)
+#   seven int32 stats: level, health, max_health, strength, magic,
+#                      experience, gold
+#   name, class: uint16 length + UTF-8 bytes
+#   ID table: uint16 count, then each ID as uint16 length + UTF-8 bytes
+#   inventory, active_quests, completed_quests: uint16 count + uint16
+#                      indexes into the ID table
+# Each item/quest ID is stored once no matter how often it appears.
+BINARY_SAVE_MAGIC = b"QCSB"
+BINARY_SAVE_VERSION = 1
+BINARY_STAT_FIELDS = ("level", "health", "max_health", "strength", "magic", "experience", "gold")
+BINARY_LIST_FIELDS = ("inventory", "active_quests", "completed_quests")
+_BINARY_HEADER = struct.Struct("<4sB7i")
+_UINT16 = struct.Struct("<H")
+
+def format_character_binary(character):
+    """
+    Encode a character in the compact binary save format
+
+    Returns: bytes
+    Raises: ValueError if a stat or list doesn't fit the format
+    """
+    character = character_as_saved(character)
+    try:
+        parts = [_BINARY_HEADER.pack(
+            BINARY_SAVE_MAGIC,
+            BINARY_SAVE_VERSION,
+            *[character[field] for field in BINARY_STAT_FIELDS]
+        )]
+
+        for text in (character['name'], character['class']):
+            encoded = text.encode("utf-8")
+            parts.append(_UINT16.pack(len(encoded)))
+            parts.append(encoded)
+
+        # Intern every ID once, lists then refer to table positions
+        id_table = {}
+        for field in BINARY_LIST_FIELDS:
+            for entry_id in character[field]:
+                id_table.setdefault(entry_id, len(id_table))
+
+        parts.append(_UINT16.pack(len(id_table)))
+        for entry_id in id_table:
+            encoded = entry_id.encode("utf-8")
+            parts.append(_UINT16.pack(len(encoded)))
+            parts.append(encoded)
+
+        for field in BINARY_LIST_FIELDS:
+            values = character[field]
+            parts.append(struct.pack(f"<H{len(values)}H", len(values),
+                                     *[id_table[entry_id] for entry_id in values]))
+    except struct.error as e:
+        raise ValueError(f"Character does not fit the binary save format: {e}")
+
+    return b"".join(parts)
+
+def parse_character_binary(data):
+    """
+    Decode the compact binary save format
+
+    Returns: Character dictionary
+    Raises: InvalidSaveDataError if the data is truncated or malformed
+    """
+    try:
+        magic, version, *stats = _BINARY_HEADER.unpack_from(data, 0)
+        if magic != BINARY_SAVE_MAGIC or version != BINARY_SAVE_VERSION:
+            raise InvalidSaveDataError("Unsupported binary save version")
+        offset = _BINARY_HEADER.size
+
+        def read_uint16():
+            nonlocal offset
+            (value,) = _UINT16.unpack_from(data, offset)
+            offset += _UINT16.size
+            return value
+
+        def read_text():
+            nonlocal offset
+            length = read_uint16()
+            if offset + length > len(data):
+                raise InvalidSaveDataError("Save file is truncated")
+            text = data[offset:offset + length].decode("utf-8")
+            offset += length
+            return text
+
+        character = {"name": read_text(), "class": read_text()}
+        character.update(zip(BINARY_STAT_FIELDS, stats))
+
+        id_table = [read_text() for _ in range(read_uint16())]
+
+        for field in BINARY_LIST_FIELDS:
+            count = read_uint16()
+            indexes = struct.unpack_from(f"<{count}H", data, offset)
+            offset += 2 * count
+            character[field] = [id_table[index] for index in indexes]
+
+    except InvalidSaveDataError:
+        raise
+    except Exception:
+        raise InvalidSaveDataError("Save file has invalid data")
+
+    # Match the key order of create_character / the text format
+    return {key: character[key] for key in (
+        "name", "class", *BINARY_STAT_FIELDS, *BINARY_LIST_FIELDS
+    )}
+
+# ============================================================================
+# INCREMENTAL SAVES (JOURNAL)
+# ============================================================================
+
+# Next to each snapshot ({name}_save.txt) there can be an append-only
+# journal ({name}_save.journal). The first line names the snapshot it
+# applies to (BASE <sha256 of the snapshot bytes>); every other line is one
+# tab-separated change:
+#   gold    +=  25                 integer stat changed by 25
+#   class   =   Mage               field set to a value
+#   inventory   +   iron_sword     ID appended to a list
+#   inventory   -   iron_sword     first copy of an ID removed from a list
+# Writing a new snapshot makes the old journal's BASE stale, so a crash
+# between writing a snapshot and deleting its journal can't apply the
+# same changes twice.
+JOURNAL_SUFFIX = ".journal"
+
+# Rewrite the full snapshot once a journal holds this many changes
+JOURNAL_COMPACT_AFTER = 100
+
+# Last persisted state of saves written with save_character_incremental:
+# {file_path: (character_copy, snapshot_sha256, journal_length)}, least
+# recently used first. Plain loads and saves don't add entries (a full save
+# only refreshes an entry that already exists), and at most
+# SAVED_STATE_LIMIT are kept; a character without an entry has its state
+# read back from disk on its next incremental save.
+SAVED_STATE_LIMIT = 256
+_saved_state = OrderedDict()
+
+def get_journal_path(character_name, save_directory="data/save_games"):
+    """Return the path of a character's change journal"""
+    return get_save_path(character_name, save_directory) + JOURNAL_SUFFIX
+
+def _copy_character(character):
+    """Copy a character deep enough that later list edits don't leak in"""
+    copy = dict(character_as_saved(character))
+    for field in BINARY_LIST_FIELDS:
+        copy[field] = list(copy[field])
+    return copy
+
+def _remember_saved(file_path, character, snapshot_data, journal_length=0):
+    """Record what is on disk for file_path"""
+    _track_state(file_path, (
+        _copy_character(character),
+        hashlib.sha256(snapshot_data).hexdigest(),
+        journal_length
+    ))
+
+def _track_state(file_path, state):
+    """Store state as the most recently used entry, evicting the oldest"""
+    key = os.path.abspath(file_path)
+    _saved_state[key] = state
+    _saved_state.move_to_end(key)
+    while len(_saved_state) > SAVED_STATE_LIMIT:
+        _saved_state.popitem(last=False)
+
+def _forget_saved(file_path):
+    """Drop the remembered state and journal of a deleted save"""
+    _saved_state.pop(os.path.abspath(file_path), None)
+    journal_path = file_path + JOURNAL_SUFFIX
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+def _snapshot_written(file_path, character, snapshot_data):
+    """A full snapshot replaced file_path: its journal is now obsolete"""
+    journal_path = file_path + JOURNAL_SUFFIX
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+    # Keep an incremental save's state current, but don't start tracking
+    if os.path.abspath(file_path) in _saved_state:
+        _remember_saved(file_path, character, snapshot_data)
+
+def diff_character(old, new):
+    """
+    Work out the journal changes that turn old into new
+
+    Returns: List of (field, operation, value) tuples
+    """
+    changes = []
+
+    if old['class'] != new['class']:
+        changes.append(("class", "=", new['class']))
+
+    for field in BINARY_STAT_FIELDS:
+        if old[field] != new[field]:
+            changes.append((field, "+=", new[field] - old[field]))
+
+    for field in BINARY_LIST_FIELDS:
+        old_list = old[field]
+        new_list = new[field]
+        if old_list == new_list:
+            continue
+
+        removed = Counter(old_list) - Counter(new_list)
+        added = Counter(new_list) - Counter(old_list)
+
+        list_changes = []
+        result = list(old_list)
+        for entry_id, count in removed.items():
+            for _ in range(count):
+                list_changes.append((field, "-", entry_id))
+                result.remove(entry_id)
+        for entry_id in new_list:
+            if added[entry_id] > 0:
+                added[entry_id] -= 1
+                list_changes.append((field, "+", entry_id))
+                result.append(entry_id)
+
+        # Appends can't express a reorder; store the whole list instead
+        if result != new_list:
+            list_changes = [(field, "=", ",".join(new_list))]
+        changes.extend(list_changes)
+
+    return changes
+
+def apply_character_change(character, field, operation, value):
+    """
+    Apply one journal change to a character
+
+    Raises: InvalidSaveDataError if the change is malformed
+    """
+    if operation == "+=" and field in BINARY_STAT_FIELDS:
+        character[field] += int(value)
+    elif operation == "=" and field in BINARY_STAT_FIELDS:
+        character[field] = int(value)
+    elif operation == "=" and field in BINARY_LIST_FIELDS:
+        character[field] = [] if value == "" else value.split(",")
+    elif operation == "=" and field == "class":
+        character[field] = value
+    elif operation == "+" and field in BINARY_LIST_FIELDS:
+        character[field].append(value)
+    elif operation == "-" and field in BINARY_LIST_FIELDS:
+        if value in character[field]:
+            character[field].remove(value)
+    else:
+        raise InvalidSaveDataError(f"Invalid journal change: {field} {operation}")
+
+def _replay_journal(file_path, character, snapshot_data):
+    """
+    Apply the journal for file_path to a freshly loaded snapshot
+
+    A journal written for an older snapshot is ignored. A torn or bad line
+    (crash mid-append) ends the replay.
+
+    Returns: (changes_applied, clean) where clean is False if the replay
+             stopped at a bad line
+    """
+    journal_path = file_path + JOURNAL_SUFFIX
+    try:
+        with open(journal_path, "r") as f:
+            lines = f.read().split("\n")
+    except FileNotFoundError:
+        return 0, True
+    except Exception as e:
+        raise SaveFileCorruptedError(f"Could not read save journal: {e}")
+
+    base = f"BASE\t{hashlib.sha256(snapshot_data).hexdigest()}"
+    if lines[0] != base:
+        return 0, True
+
+    applied = 0
+    # A complete journal ends with "\n", so the last element is ""
+    for line in lines[1:-1]:
+        parts = line.split("\t")
+        if len(parts) != 3:
+            return applied, False
+        try:
+            apply_character_change(character, *parts)
+        except (InvalidSaveDataError, ValueError):
+            return applied, False
+        applied += 1
+    return applied, lines[-1] == ""
+
+def save_character_incremental(character, save_directory="data/save_games"):
+    """
+    Save only what changed since the character was last saved or loaded
+
+    Changes are appended to the character's journal, so a save after one
+    shop purchase costs a few bytes. The previous state is remembered
+    between incremental saves; the first one for a character reads it back
+    from the save file. Without a save file (or after a torn journal) a
+    full save is made, and the journal is folded into a fresh snapshot after
+    JOURNAL_COMPACT_AFTER changes. The save manifest is only refreshed
+    when class or level change, so its gold figure may lag behind until
+    the next full save.
+
+    Returns: True if anything was written, False if nothing changed
+    Raises: SaveFileCorruptedError if the journal could not be written
+    """
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+
+    file_path = get_save_path(character['name'], save_directory)
+    with save_file_lock(character['name'], save_directory):
+        return _save_character_incremental_locked(character, save_directory, file_path)
+
+def _snapshot_unchanged(file_path, snapshot_hash, journal_length):
+    """Check that file_path and its journal are still what we last saved"""
+    try:
+        with open(file_path, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() != snapshot_hash:
+                return False
+    except OSError:
+        return False
+    return journal_length == 0 or os.path.exists(file_path + JOURNAL_SUFFIX)
+
+def _existing_save_format(file_path):
+    """
+    The format file_path is saved in, so full rewrites (fallbacks and
+    compaction) don't turn a binary save back into text
+
+    Returns: "binary" or "text" (DEFAULT_SAVE_FORMAT if there is no file)
+    """
+    try:
+        with open(file_path, "rb") as f:
+            magic = f.read(len(BINARY_SAVE_MAGIC))
+    except OSError:
+        return DEFAULT_SAVE_FORMAT
+    return "binary" if magic == BINARY_SAVE_MAGIC else "text"
+
+def _save_character_incremental_locked(character, save_directory, file_path):
+    """save_character_incremental once the save file is locked"""
+    if not os.path.exists(file_path):
+        return save_character(character, save_directory)
+
+    state = _saved_state.get(os.path.abspath(file_path))
+    if state is None:
+        # Not tracked yet (or evicted): start from what's on disk
+        saved, data, applied, clean = _read_character_file(file_path, character['name'])
+        if not clean:
+            # Torn journal: write a fresh snapshot instead of appending to it
+            return save_character(character, save_directory, _existing_save_format(file_path))
+        _remember_saved(file_path, saved, data, applied)
+        state = _saved_state[os.path.abspath(file_path)]
+    else:
+        _saved_state.move_to_end(os.path.abspath(file_path))
+
+    previous, snapshot_hash, journal_length = state
+    changes = diff_character(previous, character_as_saved(character))
+    if not changes:
+        return False
+
+    # Another process may have written a new snapshot since we last saw it;
+    # our journal wouldn't apply to that one, so write a full save instead
+    if not _snapshot_unchanged(file_path, snapshot_hash, journal_length):
+        return save_character(character, save_directory, _existing_save_format(file_path))
+
+    if journal_length + len(changes) > JOURNAL_COMPACT_AFTER:
+        return save_character(character, save_directory, _existing_save_format(file_path))
+
+    journal_path = file_path + JOURNAL_SUFFIX
+    lines = []
+    if journal_length == 0:
+        lines.append(f"BASE\t{snapshot_hash}")
+    lines.extend(f"{field}\t{operation}\t{value}" for field, operation, value in changes)
+
+    try:
+        # A fresh journal starts over any stale one from an older snapshot
+        with open(journal_path, "a" if journal_length else "w") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception as e:
+        raise SaveFileCorruptedError(f"Error writing save journal: {e}")
+
+    _track_state(file_path, (
+        _copy_character(character), snapshot_hash, journal_length + len(changes)
+    ))
+
+    if previous['class'] != character['class'] or previous['level'] != character['level']:
+        manifest_entry = _manifest_entry(character, b"")
+        manifest_entry["size"] = os.path.getsize(file_path)
+        update_save_manifest(save_directory, {character['name']: manifest_entry})
+
+    return True
+
+def compact_character(character_name, save_directory="data/save_games"):
+    """
+    Fold a character's journal into a new full snapshot
+
+    The snapshot keeps the save's current format (text or binary).
+
+    Returns: The compacted character dictionary
+    """
+    file_path = get_save_path(character_name, save_directory)
+    with save_file_lock(character_name, save_directory):
+        character = load_character(character_name, save_directory)
+        save_character(character, save_directory, _existing_save_format(file_path))
+    return character
+
+# ============================================================================
+# SAVE MANIFEST
+# ============================================================================
+
+# Summary of every save in a directory: {name: {class, level, gold,
+# saved_at, size}}. Kept up to date by save/delete so listing saves is one
+# small read instead of a directory scan plus a parse per file.
+#
+# save_index.json is a snapshot; every save/delete only appends a line to
+# save_index.log ({"name": ..., "entry": {...}} or "entry": null for a
+# delete), so a save costs the same with 20 saves or 20,000. Readers
+# replay the log over the snapshot. Once the log grows past the snapshot
+# (and MANIFEST_COMPACT_MIN_BYTES) it is folded back into the snapshot.
+MANIFEST_FILENAME = "save_index.json"
+MANIFEST_LOG_FILENAME = "save_index.log"
+MANIFEST_COMPACT_MIN_BYTES = 64 * 1024
+
+# Keys of each dictionary returned by list_saved_character_info (also the
+# valid sort keys)
+SAVE_INFO_FIELDS = ("name", "class", "level", "gold", "saved_at", "size")
+
+def get_manifest_path(save_directory="data/save_games"):
+    """Return the path of the save manifest for a save directory"""
+    return os.path.join(save_directory, MANIFEST_FILENAME)
+
+def get_manifest_log_path(save_directory="data/save_games"):
+    """Return the path of the manifest's append-only change log"""
+    return os.path.join(save_directory, MANIFEST_LOG_FILENAME)
+
+def _manifest_entry(character, data):
+    """Build the manifest entry for a character that was just saved"""
+    return {
+        "class": character['class'],
+        "level": character['level'],
+        "gold": character['gold'],
+        "saved_at": time.time(),
+        "size": len(data)
+    }
+
+def read_save_manifest(save_directory="data/save_games"):
+    """
+    Read the save manifest (snapshot plus change log)
+
+    Returns: Dictionary {name: entry}, or None if there is no usable manifest
+    """
+    manifest_path = get_manifest_path(save_directory)
+    if not os.path.exists(manifest_path):
+        return None
+
+    # Shared lock so a compaction can't swap the snapshot and drop the
+    # log between our two reads
+    with _manifest_lock(save_directory, exclusive=False):
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(manifest, dict):
+            return None
+
+        try:
+            with open(get_manifest_log_path(save_directory), "r") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record["entry"] is None:
+                        manifest.pop(record["name"], None)
+                    else:
+                        manifest[record["name"]] = record["entry"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError):
+            # Torn or damaged log line: don't trust a partial manifest
+            return None
+    return manifest
+
+def rebuild_save_manifest(save_directory="data/save_games"):
+    """
+    Rebuild the manifest by scanning and loading every save file
+
+    Saves that can't be loaded are still listed, with blank details.
+
+    Returns: The new manifest dictionary
+    """
+    manifest = {}
+    if os.path.exists(save_directory):
+        # Scan under the manifest lock so no save can log an entry that
+        # the new snapshot then throws away
+        with _manifest_lock(save_directory):
+            for name, file_path in iter_save_files(save_directory):
+                try:
+                    with open(file_path, "rb") as f:
+                        data = f.read()
+                    entry = _manifest_entry(decode_character_save(data), data)
+                    entry["saved_at"] = os.path.getmtime(file_path)
+                except Exception:
+                    entry = {"class": "", "level": 0, "gold": 0, "saved_at": 0, "size": 0}
+                manifest[name] = entry
+            _write_manifest_snapshot(save_directory, manifest)
+    return manifest
+
+def _write_manifest_snapshot(save_directory, manifest):
+    """Replace the snapshot with manifest and start an empty change log"""
+    write_file_atomic(get_manifest_path(save_directory), json.dumps(manifest))
+    # Replaying the old log over the new snapshot would be harmless (every
+    # line sets or drops one name), so a crash before this is fine
+    if os.path.exists(get_manifest_log_path(save_directory)):
+        os.remove(get_manifest_log_path(save_directory))
+
+def update_save_manifest(save_directory, entries=None, removals=()):
+    """
+    Add/replace manifest entries and drop removed characters
+
+    The changes are appended to the manifest log, so the cost does not
+    depend on how many saves the directory holds. A missing manifest is
+    rebuilt from the directory first so it never forgets saves made before
+    it existed. If the update fails the manifest is deleted, making the
+    next listing fall back to a directory scan rather than trusting stale
+    data.
+    """
+    manifest_path = get_manifest_path(save_directory)
+    log_path = get_manifest_log_path(save_directory)
+    try:
+        with _manifest_lock(save_directory):
+            if not os.path.exists(manifest_path):
+                rebuild_save_manifest(save_directory)
+
+            lines = [json.dumps({"name": name, "entry": entry}) + "\n"
+                     for name, entry in (entries or {}).items()]
+            lines += [json.dumps({"name": name, "entry": None}) + "\n" for name in removals]
+            with open(log_path, "a") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Fold the log into the snapshot once it outgrows it, which
+            # keeps compaction at amortized O(1) per save
+            log_size = os.path.getsize(log_path)
+            if log_size > max(MANIFEST_COMPACT_MIN_BYTES, os.path.getsize(manifest_path)):
+                compact_save_manifest(save_directory)
+    except Exception:
+        for path in (manifest_path, log_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def compact_save_manifest(save_directory="data/save_games"):
+    """
+    Fold the manifest log into the snapshot
+
+    Returns: The compacted manifest dictionary, or None if there is no
+             usable manifest to compact
+    """
+    with _manifest_lock(save_directory):
+        manifest = read_save_manifest(save_directory)
+        if manifest is not None:
+            _write_manifest_snapshot(save_directory, manifest)
+    return manifest
+
+def list_saved_character_info(save_directory="data/save_games", sort_by="name", descending=False):
+    """
+    List saved characters with their details, without opening any save file
+
+    Args:
+        sort_by: "name", "class", "level", "gold", "saved_at" or "size"
+        descending: Reverse the sort order
+
+    Returns: List of dictionaries with name, class, level, gold,
+             saved_at (timestamp) and size (bytes)
+    Raises: ValueError if sort_by is not one of SAVE_INFO_FIELDS
+    """
+    if sort_by not in SAVE_INFO_FIELDS:
+        raise ValueError(f"Cannot sort saves by {sort_by}")
+
+    if not os.path.exists(save_directory):
+        return []
+
+    manifest = read_save_manifest(save_directory)
+    if manifest is None:
+        manifest = rebuild_save_manifest(save_directory)
+
+    info = [dict(entry, name=name) for name, entry in manifest.items()]
+    info.sort(key=lambda entry: entry[sort_by], reverse=descending)
+    return info
+
+# ============================================================================
+# EXPERIENCE TABLE
+# ============================================================================
+
+# Going from level n to n + 1 costs n * XP_PER_LEVEL experience, so the
+# total needed to reach level n from level 1 is an arithmetic series:
+#   XP_PER_LEVEL * n * (n - 1) / 2
+XP_PER_LEVEL = 100
+LEVEL_UP_MAX_HEALTH = 10
+LEVEL_UP_STRENGTH = 2
+LEVEL_UP_MAGIC = 2
+
+# CUMULATIVE_XP_TABLE[n] = total XP needed to reach level n (index 0 unused)
+CUMULATIVE_XP_TABLE_SIZE = 100
+
+def total_xp_for_level(level):
+    """
+    Total experience needed to go from level 1 to level
+
+    Example: total_xp_for_level(3) → 300 (100 for level 2 + 200 for level 3)
+    """
+    return XP_PER_LEVEL * level * (level - 1) // 2
+
+CUMULATIVE_XP_TABLE = [0] + [total_xp_for_level(level) for level in range(1, CUMULATIVE_XP_TABLE_SIZE + 1)]
+
+def get_cumulative_xp_table(max_level=CUMULATIVE_XP_TABLE_SIZE):
+    """
+    Returns: List where entry n is the total XP needed to reach level n
+             (entry 0 is unused), for levels 1..max_level
+    """
+    if max_level <= CUMULATIVE_XP_TABLE_SIZE:
+        return CUMULATIVE_XP_TABLE[:max_level + 1]
+    return [0] + [total_xp_for_level(level) for level in range(1, max_level + 1)]
+
+def level_for_total_xp(total_xp):
+    """
+    Find the level reached with total_xp experience earned since level 1
+
+    Returns: Tuple (level, leftover_xp) where leftover_xp counts towards
+             the next level
+    """
+    if total_xp <= 0:
+        return 1, max(total_xp, 0)
+
+    # Largest n with n * (n - 1) <= total_xp * 2 / XP_PER_LEVEL
+    budget = total_xp * 2 // XP_PER_LEVEL
+    level = (1 + math.isqrt(1 + 4 * budget)) // 2
+
+    # Guard against rounding at the boundaries
+    while total_xp_for_level(level + 1) <= total_xp:
+        level += 1
+    while total_xp_for_level(level) > total_xp:
+        level -= 1
+
+    return level, total_xp - total_xp_for_level(level)
+
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
@@ -291,25 +1612,25 @@ def gain_experience(character, xp_amount):
 #Add XP
     character["experience"] += xp_amount
 
-#Continue leveling up as long as XP meets requirement
-    while True:
-        required_xp = character["level"] * 100
+    level = character["level"]
+    experience = character["experience"]
 
-#Not enough XP means stop
-        if character["experience"] < required_xp:
-            break
+#Not enough XP for even one level means stop
+    if experience < level * XP_PER_LEVEL:
+        return character
 
-#Use up the XP required for level-up
-        character["experience"] -= required_xp
+#Solve for the final level directly instead of looping one level at a time
+    new_level, remaining_xp = level_for_total_xp(total_xp_for_level(level) + experience)
+    levels_gained = new_level - level
 
-#Level up
-        character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
+    character["experience"] = remaining_xp
+    character["level"] = new_level
+    character["max_health"] += LEVEL_UP_MAX_HEALTH * levels_gained
+    character["strength"] += LEVEL_UP_STRENGTH * levels_gained
+    character["magic"] += LEVEL_UP_MAGIC * levels_gained
 
 #Restores health on level up
-        character["health"] = character["max_health"]
+    character["health"] = character["max_health"]
 
     return character
 
@@ -444,7 +1765,7 @@ def validate_character_data(character):
     list_fields = ["inventory", "active_quests", "completed_quests"]
 
     for key in list_fields:
-        if not isinstance(character[key], list):
+        if not isinstance(character[key], (list, Inventory)):
             raise InvalidSaveDataError(f"{key} must be a list")
 
     return True
@@ -454,6 +1775,84 @@ def validate_character_data(character):
     # Check that numeric values are numbers
     # Check that lists are actually lists
 
+# ============================================================================
+# BULK OPERATIONS
+# ============================================================================
+
+# Operation name -> function(character, *args) usable in bulk_update_characters
+BULK_OPERATIONS = {
+    "gain_experience": gain_experience,
+    "add_gold": add_gold,
+    "heal": heal_character,
+    "revive": revive_character,
+}
+
+def bulk_update_characters(character_names, operations, save_directory="data/save_games",
+                           save_format=DEFAULT_SAVE_FORMAT):
+    """
+    Load many characters, apply the same operations to each, and save
+    them all in one group commit (see save_characters)
+
+    Meant for batch jobs like season rewards or mass revives.
+
+    Args:
+        character_names: Names of the saved characters to update
+        operations: List of (operation_name, args...) tuples, applied in
+                    order, e.g. [("add_gold", 50), ("revive",)]
+        save_directory: Directory containing save files
+        save_format: Format used when writing the updated saves
+
+    Returns: Dictionary with
+        updated: number of characters saved
+        failed: {name: error message} for characters that could not be
+                loaded, updated or validated (their saves are untouched)
+        seconds: time taken for the whole batch
+        characters_per_second: throughput of the batch
+    Raises: ValueError for an unknown operation name or the wrong number
+            of arguments for an operation (before any loading)
+            SaveFileCorruptedError if the bulk write fails
+    """
+    steps = []
+    for operation in operations:
+        if not operation or operation[0] not in BULK_OPERATIONS:
+            raise ValueError(f"Unknown bulk operation: {operation}")
+        function = BULK_OPERATIONS[operation[0]]
+        args = tuple(operation[1:])
+        try:
+            inspect.signature(function).bind(None, *args)
+        except TypeError as e:
+            raise ValueError(f"Bad arguments for bulk operation {operation[0]}: {e}")
+        steps.append((function, args))
+
+    character_names = list(character_names)
+    start = time.perf_counter()
+    updated = []
+    failed = {}
+
+    for name in character_names:
+        try:
+            character = load_character(name, save_directory)
+            for function, args in steps:
+                function(character, *args)
+            validate_character_data(character)
+        except (ValueError, TypeError, GameError) as e:
+            # One bad character (or a bad argument type, e.g. gold as a
+            # string) shouldn't sink the whole batch
+            failed[name] = str(e)
+            continue
+        updated.append(character)
+
+    if updated:
+        save_characters(updated, save_directory, save_format)
+
+    seconds = time.perf_counter() - start
+    return {
+        "updated": len(updated),
+        "failed": failed,
+        "seconds": seconds,
+        "characters_per_second": len(character_names) / seconds if seconds > 0 else 0.0,
+    }
+
 # ============================================================================
 # TESTING
 # ============================================================================
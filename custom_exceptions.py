@@ -123,3 +123,7 @@ class InvalidSaveDataError(GameError):
     """Raised when save file contains invalid data"""
     pass
 
+class SaveLockTimeoutError(GameError):
+    """Raised when a save file stays locked by another process for too long"""
+    pass
+
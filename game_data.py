@@ -10,17 +10,37 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import glob
+import hashlib
+import mmap
+import pickle
+import sys
+import time
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from custom_exceptions import (
+    DataError,
     InvalidDataFormatError,
     MissingDataFileError,
     CorruptedDataError
 )
 
+# Compiled cache files live next to the source file ({filename}.cache).
+# Bump CACHE_VERSION whenever the parsed record layout changes so old
+# caches are ignored instead of handing back stale dictionaries.
+CACHE_VERSION = 4
+CACHE_SUFFIX = ".cache"
+
+# Offsets index used by ItemCatalog ({filename}.idx)
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
 
-def load_quests(filename="data/quests.txt"):
+def load_quests(filename="data/quests.txt", use_cache=True):
     """
     Load quest data from file
     
@@ -33,41 +53,48 @@ def load_quests(filename="data/quests.txt"):
     REQUIRED_LEVEL: 1
     PREREQUISITE: previous_quest_id (or NONE)
     
+    If use_cache is True, a compiled cache next to the file is used when
+    it is still fresh and rebuilt after a successful parse.
+
     Returns: Dictionary of quests {quest_id: quest_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
-    try:
-        with open(filename, 'r') as file:
-            lines = file.readlines()
-    except FileNotFoundError:
-        raise MissingDataFileError(f"Quest file is not found: {filename}")
-    except Exception:
-        raise CorruptedDataError(f"Quest file is unreadable: {filename}")
-    
-    quest = {}
-    current_block = []
-
-    for line in lines:
-        stripped = line.strip()
-        if stripped == "":
-            if current_block:
-                quest_dict = parse_quest_block(current_block)
-                validate_quest_data(quest_dict)
-                quest[quest_dict['quest_id']] = quest_dict
-                current_block = []
-        else:
-            current_block.append(stripped)
-    
-    if current_block:
-        quest_dict = parse_quest_block(current_block)
-        validate_quest_data(quest_dict)
-        quest[quest_dict['quest_id']] = quest_dict
+    return _load_with_cache(filename, "quests", _parse_quest_file, use_cache)
+
 
-    return quest
+def _parse_quest_file(filename):
+    """Parse and validate every quest block in filename (no caching)"""
+    return _index_records(_iter_quest_records(filename), "quest_id", "quest", filename)
 
 
+def iter_quests(filename="data/quests.txt"):
+    """
+    Yield validated quest dictionaries one block at a time
+
+    Only the current block is held in memory, so very large quest packs
+    can be validated or imported without loading the whole file.
 
-def load_items(filename="data/items.txt"):
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    for start_line, quest_dict in _iter_quest_records(filename):
+        yield quest_dict
+
+
+def _iter_quest_records(filename):
+    """Yield (start_line, quest_dict) for every validated quest block"""
+    records = _iter_records(
+        filename,
+        QUEST_FIELD_TABLE,
+        QUEST_FORMAT,
+        f"Quest file is not found: {filename}",
+        f"Quest file is unreadable: {filename}"
+    )
+    for start_line, quest_dict in records:
+        validate_quest_data(quest_dict)
+        yield start_line, quest_dict
+
+
+def load_items(filename="data/items.txt", use_cache=True):
     """
     Load item data from file
     
@@ -75,41 +102,71 @@ def load_items(filename="data/items.txt"):
     ITEM_ID: unique_item_name
     NAME: Item Display Name
     TYPE: weapon|armor|consumable
-    EFFECT: stat_name:value (e.g., strength:5 or health:20)
+    EFFECT: stat_name:value (e.g., strength:5 or health:20, or several
+            separated by commas such as strength:5,magic:2)
     COST: 100
+    MAX_STACK: 10 (optional, how many fit in one inventory slot;
+              defaults to DEFAULT_MAX_STACK for the item's type)
     DESCRIPTION: Item description
     
+    If use_cache is True, a compiled cache next to the file is used when
+    it is still fresh and rebuilt after a successful parse.
+
     Returns: Dictionary of items {item_id: item_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
-    try:
-        with open(filename, 'r') as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        raise MissingDataFileError(f"Item data file is not found: {filename}")
-    except Exception:
-        raise CorruptedDataError(f"Item file is unreadable: {filename}")
-    
-    item = {}
-    current_block = []
-
-    for line in lines:
-        stripped = line.strip()
-        if stripped == "":
-            if current_block:
-                item_dict = parse_item_block(current_block)
-                validate_item_data(item_dict)
-                item[item_dict['item_id']] = item_dict
-                current_block = []
-        else:
-            current_block.append(stripped)
+    return _load_with_cache(filename, "items", _parse_item_file, use_cache)
+
+
+def _parse_item_file(filename):
+    """Parse and validate every item block in filename (no caching)"""
+    return _index_records(_iter_item_records(filename), "item_id", "item", filename)
+
+
+def iter_items(filename="data/items.txt"):
+    """
+    Yield validated item dictionaries one block at a time
 
-    if current_block:
-        item_dict = parse_item_block(current_block)
-        validate_item_data(item_dict)
-        item[item_dict['item_id']] = item_dict
+    Only the current block is held in memory, so very large item packs
+    can be validated or imported without loading the whole file.
+
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    for start_line, item_dict in _iter_item_records(filename):
+        yield item_dict
 
-    return item
+
+def _iter_item_records(filename):
+    """Yield (start_line, item_dict) for every prepared item block"""
+    records = _iter_records(
+        filename,
+        ITEM_FIELD_TABLE,
+        ITEM_FORMAT,
+        f"Item data file is not found: {filename}",
+        f"Item file is unreadable: {filename}"
+    )
+    for start_line, item_dict in records:
+        yield start_line, prepare_item(item_dict)
+
+
+def _index_records(records, id_field, record_name, filename):
+    """
+    Build {record_id: record} from (start_line, record) pairs
+
+    Raises: InvalidDataFormatError if an ID appears twice in the file
+    """
+    index = {}
+    first_lines = {}
+    for start_line, record in records:
+        record_id = record[id_field]
+        if record_id in index:
+            raise InvalidDataFormatError(
+                f"Duplicate {record_name} id {record_id} on line {start_line} of {filename} "
+                f"(first defined on line {first_lines[record_id]})"
+            )
+        index[record_id] = record
+        first_lines[record_id] = start_line
+    return index
 
 
 def validate_quest_data(quest_dict):
@@ -122,26 +179,7 @@ def validate_quest_data(quest_dict):
     Returns: True if valid
     Raises: InvalidDataFormatError if missing required fields
     """
-    required_fields = [
-        "quest_id",
-        "title",
-        "description",
-        "reward_xp",
-        "reward_gold",
-        "required_level",
-        "prerequisite"
-    ]
-    #checking for required fields
-    for field in required_fields:
-        if field not in quest_dict:
-            raise InvalidDataFormatError(f"Missing field in quest: {field}")
-        
-    numeric_fields = ["reward_xp", "reward_gold", "required_level"]
-
-    for key in numeric_fields:
-        if not isinstance(quest_dict[key], int):
-            raise InvalidDataFormatError(f"Field {key} must be an integer")
-    return True
+    return QUEST_SCHEMA.validate(quest_dict)
 
 
 def validate_item_data(item_dict):
@@ -154,33 +192,84 @@ def validate_item_data(item_dict):
     Returns: True if valid
     Raises: InvalidDataFormatError if missing required fields or invalid type
     """
-    required_fields = [
-        "item_id",
-        "name",
-        "type",
-        "effect",
-        "cost",
-        "description"
-    ]
-    for field in required_fields:
-        if field not in item_dict:
-            raise InvalidDataFormatError(f"Missing field in item: {field}")
-        
-        #Type must be weapon, armor or a consumable
-    valid_types = {"weapon", "armor", "consumable"}
-
-    if item_dict["type"] not in valid_types:
-        raise InvalidDataFormatError(f"Invalid item type: {item_dict['type']}")
-    
-    #Cost must be a real integer
-    if not isinstance(item_dict["cost"], int):
-        raise InvalidDataFormatError("Item cost must be an integer")
-    
-    #Effect must be in the format stat_name:value
-    if ":" not in item_dict["effect"]:
-        raise InvalidDataFormatError("Item effect must be in format stat_name:value")
-    return True
-    # TODO: Implement validation
+    return ITEM_SCHEMA.validate(item_dict)
+
+
+def prepare_item(item_dict):
+    """
+    Validate a freshly parsed item and attach its pre-parsed effects
+
+    item_dict["effects"] is an immutable tuple of (stat_name, value) pairs
+    built from the EFFECT string, so equipping and using items never has
+    to split or convert the string again. Items without a MAX_STACK line
+    get the default stack size for their type.
+
+    Returns: The same item dictionary
+    Raises: InvalidDataFormatError if the item is invalid
+    """
+    validate_item_data(item_dict)
+    item_dict["effects"] = parse_effects(item_dict["effect"])
+    if "max_stack" not in item_dict:
+        item_dict["max_stack"] = DEFAULT_MAX_STACK.get(item_dict["type"], 1)
+    return item_dict
+
+
+def validate_catalog(filename, kind):
+    """
+    Check every record of a quest or item file and report all problems
+
+    Unlike load_quests/load_items this does not stop at the first bad
+    record, so a whole content pack can be fixed in one go.
+
+    Args:
+        filename: Data file to check
+        kind: "quests" or "items"
+
+    Returns: List of (line_number, message) tuples, empty if the file is valid
+    Raises: MissingDataFileError, CorruptedDataError
+    """
+    if kind == "quests":
+        schema, field_table, block_format = QUEST_SCHEMA, QUEST_FIELD_TABLE, QUEST_FORMAT
+    elif kind == "items":
+        schema, field_table, block_format = ITEM_SCHEMA, ITEM_FIELD_TABLE, ITEM_FORMAT
+    else:
+        raise ValueError(f"Unknown content kind: {kind}")
+
+    id_field = schema.id_field
+    seen_ids = {}
+    errors = []
+
+    blocks = _iter_blocks(
+        filename,
+        f"Data file is not found: {filename}",
+        f"Data file is unreadable: {filename}"
+    )
+    for start_line, block in blocks:
+        try:
+            record = _parse_block(block, field_table, block_format)
+        except InvalidDataFormatError as e:
+            errors.append((start_line, str(e)))
+            continue
+
+        for field, message in schema.check(record):
+            errors.append((_find_field_line(block, start_line, field), message))
+
+        record_id = record.get(id_field)
+        if record_id in seen_ids:
+            errors.append((start_line, f"Duplicate {schema.record_name} id {record_id} "
+                                       f"(first defined on line {seen_ids[record_id]})"))
+        elif record_id is not None:
+            seen_ids[record_id] = start_line
+
+    return errors
+
+
+def _find_field_line(block, start_line, field):
+    """Return the line number of field inside a block (or the block start)"""
+    for offset, line in enumerate(block):
+        if line.partition(":")[0].strip().lower() == field:
+            return start_line + offset
+    return start_line
 
 
 def create_default_data_files():
@@ -235,6 +324,56 @@ DESCRIPTION: Basic melee weapon.
 # HELPER FUNCTIONS
 # ============================================================================
 
+def _iter_blocks(filename, missing_message, unreadable_message):
+    """
+    Stream blank-line separated blocks from a data file
+
+    Args:
+        filename: Data file to read
+        missing_message: Message for MissingDataFileError
+        unreadable_message: Message for CorruptedDataError
+
+    Yields: (start_line, lines) where start_line is the 1-based line number
+            of the block's first line and lines are the stripped lines
+    Raises: MissingDataFileError, CorruptedDataError
+    """
+    try:
+        file = open(filename, 'r')
+    except FileNotFoundError:
+        raise MissingDataFileError(missing_message)
+    except Exception:
+        raise CorruptedDataError(unreadable_message)
+
+    with file:
+        current_block = []
+        start_line = 0
+        line_number = 0
+        lines = iter(file)
+
+        while True:
+            #reading can still fail mid-file (e.g. bad encoding)
+            try:
+                line = next(lines)
+            except StopIteration:
+                break
+            except Exception:
+                raise CorruptedDataError(unreadable_message)
+
+            line_number += 1
+            stripped = line.strip()
+            if stripped == "":
+                if current_block:
+                    yield start_line, current_block
+                    current_block = []
+            else:
+                if not current_block:
+                    start_line = line_number
+                current_block.append(stripped)
+
+        if current_block:
+            yield start_line, current_block
+
+
 def parse_quest_block(lines):
     """
     Parse a block of lines into a quest dictionary
@@ -245,31 +384,7 @@ def parse_quest_block(lines):
     Returns: Dictionary with quest data
     Raises: InvalidDataFormatError if parsing fails
     """
-    quest = {}
-
-    for line in lines:
-        if ":" not in line:
-            raise InvalidDataFormatError(f"Quest line missing ':' seperator")
-        
-        key, value = line.split(":", 1)
-
-        key = key.strip().lower()
-        value = value.strip()
-
-        quest[key] = value
-
-    try:
-        quest["reward_xp"] = int(quest["reward_xp"])
-        quest["reward_gold"] = int(quest["reward_gold"])
-        quest["required_level"] = int(quest["required_level"])
-    except Exception:
-        raise InvalidDataFormatError("Quest numeric field is invalid")
-    return quest
-    # TODO: Implement parsing logic
-    # Split each line on ": " to get key-value pairs
-    # Convert numeric strings to integers
-    # Handle parsing errors gracefully
-    pass
+    return _parse_block(lines, QUEST_FIELD_TABLE, QUEST_FORMAT)
 
 def parse_item_block(lines):
     """
@@ -281,28 +396,946 @@ def parse_item_block(lines):
     Returns: Dictionary with item data
     Raises: InvalidDataFormatError if parsing fails
     """
-    item = {}
+    return _parse_block(lines, ITEM_FIELD_TABLE, ITEM_FORMAT)
+
+# ============================================================================
+# BLOCK TOKENIZER
+# ============================================================================
+
+def _compile_field_table(fields):
+    """
+    Build the lookup table used by _parse_block
+
+    Args:
+        fields: List of (field_name, converter) pairs, converter is None
+                for text fields or a function such as int
+
+    Returns: Dictionary {RAW_KEY: (interned_key, converter)}
+    """
+    table = {}
+    for name, converter in fields:
+        table[name.upper()] = (sys.intern(name), converter)
+    return table
+
+
+QUEST_FIELD_TABLE = _compile_field_table([
+    ("quest_id", None),
+    ("title", None),
+    ("description", None),
+    ("reward_xp", int),
+    ("reward_gold", int),
+    ("required_level", int),
+    ("prerequisite", None)
+])
+
+ITEM_FIELD_TABLE = _compile_field_table([
+    ("item_id", None),
+    ("name", None),
+    ("type", None),
+    ("effect", None),
+    ("cost", int),
+    ("max_stack", int),
+    ("description", None)
+])
+
+# Per-format settings: (separator, number of typed fields, missing
+# separator message, bad number message)
+QUEST_FORMAT = (":", 3, "Quest line missing ':' seperator", "Quest numeric field is invalid")
+ITEM_FORMAT = (": ", 1, "Item line missing ': ' separator", "Item cost must be an integer")
+
+
+def _parse_block(lines, field_table, block_format):
+    """
+    Parse a single block (list of lines) into a record dictionary
+
+    Raises: InvalidDataFormatError if parsing fails
+    """
+    for start_line, record in _tokenize_blocks(lines, field_table, block_format):
+        return record
+    # An empty block is missing every typed field
+    raise InvalidDataFormatError(block_format[3])
+
+
+def _iter_records(filename, field_table, block_format, missing_message, unreadable_message):
+    """
+    Stream parsed (not yet validated) records straight from a data file
+
+    Yields: (start_line, record)
+    Raises: MissingDataFileError, CorruptedDataError, InvalidDataFormatError
+    """
+    try:
+        file = open(filename, 'r')
+    except FileNotFoundError:
+        raise MissingDataFileError(missing_message)
+    except Exception:
+        raise CorruptedDataError(unreadable_message)
+
+    with file:
+        try:
+            yield from _tokenize_blocks(file, field_table, block_format)
+        except (UnicodeDecodeError, OSError):
+            #reading failed mid-file (e.g. bad encoding)
+            raise CorruptedDataError(unreadable_message)
+
+
+def _tokenize_blocks(lines, field_table, block_format):
+    """
+    Single-pass tokenizer shared by the quest and item formats
+
+    Each line is split once on the separator. Known keys are looked up in
+    the precompiled field table, which gives the interned dictionary key
+    and converts typed fields on the spot. Unknown keys are kept as
+    lowercase text fields like before. Blank lines end a record.
+
+    Args:
+        lines: Any iterable of lines (open file or list of strings)
+        field_table: Table from _compile_field_table
+        block_format: QUEST_FORMAT or ITEM_FORMAT
+
+    Yields: (start_line, record) with 1-based line numbers
+    Raises: InvalidDataFormatError if a line has no separator or a typed
+            field is missing or not a number
+    """
+    separator, typed_count, missing_separator, bad_number = block_format
+    get_field = field_table.get
+    record = None
+    typed_seen = 0
+    start_line = 0
+
+    for line_number, line in enumerate(lines, 1):
+        raw_key, found, value = line.partition(separator)
+
+        if not found:
+            if line.strip():
+                raise InvalidDataFormatError(missing_separator)
+            # Blank line ends the current record
+            if record is not None:
+                if typed_seen < typed_count:
+                    raise InvalidDataFormatError(bad_number)
+                yield start_line, record
+                record = None
+            continue
+
+        if record is None:
+            record = {}
+            typed_seen = 0
+            start_line = line_number
+
+        field = get_field(raw_key)
+        if field is None:
+            normalized = raw_key.strip().upper()
+            field = get_field(normalized)
+            if field is None:
+                field = (sys.intern(normalized.lower()), None)
+
+        key, converter = field
+        if converter is None:
+            record[key] = value.strip()
+        else:
+            try:
+                record[key] = converter(value)
+            except ValueError:
+                raise InvalidDataFormatError(bad_number)
+            typed_seen += 1
+
+    if record is not None:
+        if typed_seen < typed_count:
+            raise InvalidDataFormatError(bad_number)
+        yield start_line, record
+
+# ============================================================================
+# VALIDATION SCHEMAS
+# ============================================================================
+
+# Stats an item effect is allowed to modify
+VALID_EFFECT_STATS = ("health", "max_health", "strength", "magic")
+
+# Items per inventory slot when an item has no MAX_STACK line
+DEFAULT_MAX_STACK = {"consumable": 10, "weapon": 1, "armor": 1}
+
+
+def parse_effects(effect):
+    """
+    Parse an effect string into a tuple of (stat_name, value) pairs
+
+    Several effects are separated by commas, e.g. "strength:5,magic:2"
+
+    Returns: Tuple such as (("strength", 5), ("magic", 2))
+    Raises: InvalidDataFormatError if any part breaks the stat:value grammar
+    """
+    effects = []
+    for part in effect.split(","):
+        stat_name, found, value = part.partition(":")
+        stat_name = stat_name.strip()
+        if not found or stat_name not in VALID_EFFECT_STATS:
+            raise InvalidDataFormatError(f"Invalid effect: {effect}")
+        try:
+            effects.append((sys.intern(stat_name), int(value)))
+        except ValueError:
+            raise InvalidDataFormatError(f"Invalid effect: {effect}")
+    return tuple(effects)
+
+
+def is_valid_effect(effect):
+    """
+    Check an effect string against the "stat_name:value[,stat_name:value]"
+    grammar
+
+    Returns: True if every stat_name is a known stat and value is an integer
+    """
+    try:
+        parse_effects(effect)
+    except InvalidDataFormatError:
+        return False
+    return True
+
+
+# Named grammars a schema field can refer to
+FIELD_GRAMMARS = {
+    "effect": (is_valid_effect, "must be in format stat_name:value"),
+}
+
+
+class RecordSchema:
+    """
+    Declarative description of one record type
+
+    Each field maps to a dict of rules:
+        type:    str or int (required)
+        choices: allowed values
+        grammar: name of an entry in FIELD_GRAMMARS
+        min/max: integer range (inclusive)
+        optional: True if the field may be left out
+
+    The rules are compiled into a list of small check functions once, when
+    the schema is created, so validating a record only runs those checks.
+    """
+
+    def __init__(self, record_name, id_field, fields):
+        self.record_name = record_name
+        self.id_field = id_field
+        self.fields = fields
+        self._checks = self._compile()
+
+    def _compile(self):
+        """Turn the field rules into a list of (field, check) pairs"""
+        checks = []
+        record_name = self.record_name
+
+        for field, rules in self.fields.items():
+            field_type = rules["type"]
+            label = f"{record_name.capitalize()} {field}"
+
+            if field_type is int:
+                type_message = f"Field {field} must be an integer"
+            else:
+                type_message = f"Field {field} must be text"
+
+            def check_type(value, field_type=field_type, message=type_message):
+                if not isinstance(value, field_type):
+                    return message
+                return None
+            checks.append((field, check_type))
+
+            if "choices" in rules:
+                choices = frozenset(rules["choices"])
+                def check_choice(value, choices=choices, field=field):
+                    if value not in choices:
+                        return f"Invalid {record_name} {field}: {value}"
+                    return None
+                checks.append((field, check_choice))
+
+            if "grammar" in rules:
+                matches, description = FIELD_GRAMMARS[rules["grammar"]]
+                def check_grammar(value, matches=matches, message=f"{label} {description}"):
+                    if isinstance(value, str) and not matches(value):
+                        return message
+                    return None
+                checks.append((field, check_grammar))
+
+            if "min" in rules or "max" in rules:
+                low = rules.get("min")
+                high = rules.get("max")
+                def check_range(value, low=low, high=high, label=label):
+                    if not isinstance(value, int):
+                        return None
+                    if low is not None and value < low:
+                        return f"{label} must be at least {low}"
+                    if high is not None and value > high:
+                        return f"{label} must be at most {high}"
+                    return None
+                checks.append((field, check_range))
+
+        return checks
+
+    def check(self, record):
+        """
+        Run every rule against a record
+
+        Returns: List of (field, message) for each problem found
+        """
+        errors = []
+        for field, rules in self.fields.items():
+            if field not in record and not rules.get("optional"):
+                errors.append((field, f"Missing field in {self.record_name}: {field}"))
+
+        for field, check in self._checks:
+            if field in record:
+                message = check(record[field])
+                if message is not None:
+                    errors.append((field, message))
+        return errors
+
+    def validate(self, record):
+        """
+        Validate a record
+
+        Returns: True if valid
+        Raises: InvalidDataFormatError listing every problem found
+        """
+        errors = self.check(record)
+        if errors:
+            raise InvalidDataFormatError("; ".join(message for field, message in errors))
+        return True
+
+
+QUEST_SCHEMA = RecordSchema("quest", "quest_id", {
+    "quest_id": {"type": str},
+    "title": {"type": str},
+    "description": {"type": str},
+    "reward_xp": {"type": int, "min": 0},
+    "reward_gold": {"type": int, "min": 0},
+    "required_level": {"type": int, "min": 1},
+    "prerequisite": {"type": str}
+})
+
+ITEM_SCHEMA = RecordSchema("item", "item_id", {
+    "item_id": {"type": str},
+    "name": {"type": str},
+    "type": {"type": str, "choices": ("weapon", "armor", "consumable")},
+    "effect": {"type": str, "grammar": "effect"},
+    "cost": {"type": int, "min": 0},
+    "max_stack": {"type": int, "min": 1, "optional": True},
+    "description": {"type": str}
+})
+
+# ============================================================================
+# COMPILED CACHE
+# ============================================================================
+
+def get_cache_path(filename):
+    """Return the path of the compiled cache file for a data file"""
+    return filename + CACHE_SUFFIX
+
+
+def _hash_file(filename):
+    """Return the sha256 hex digest of a file's raw bytes"""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_cache(filename, kind, stat):
+    """
+    Return cached records for filename, or None if the cache is missing,
+    unreadable, built by another CACHE_VERSION or out of date.
 
-    for line in lines:
-        if ": " not in line:
-            raise InvalidDataFormatError("Item line missing ': ' separator")
+    The cache is fresh when size and mtime match the source. If only the
+    mtime changed (e.g. a git checkout touched the file) the content hash
+    decides.
+    """
+    try:
+        with open(get_cache_path(filename), "rb") as f:
+            cache = pickle.load(f)
+    except Exception:
+        return None
 
-        key, value = line.split(": ", 1)
+    if not isinstance(cache, dict):
+        return None
+    if cache.get("version") != CACHE_VERSION or cache.get("kind") != kind:
+        return None
+    if cache.get("size") != stat.st_size:
+        return None
+    if cache.get("mtime_ns") != stat.st_mtime_ns:
+        try:
+            if cache.get("sha256") != _hash_file(filename):
+                return None
+        except OSError:
+            return None
 
-        key = key.strip().lower()
-        value = value.strip()
+    return cache.get("data")
 
-        item[key] = value
 
-    # Convert cost to int
+def _write_cache(filename, kind, stat, data):
+    """
+    Write records to the compiled cache for filename
+
+    The cache is written to a temporary file and moved into place so other
+    processes never see a half-written cache. Failures are ignored because
+    the cache is only an optimization (e.g. read-only data directory).
+    """
+    cache_path = get_cache_path(filename)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
     try:
-        item["cost"] = int(item["cost"])
+        cache = {
+            "version": CACHE_VERSION,
+            "kind": kind,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": _hash_file(filename),
+            "data": data
+        }
+        with open(temp_path, "wb") as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
     except Exception:
-        raise InvalidDataFormatError("Item cost must be an integer")
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def _load_with_cache(filename, kind, parse_file, use_cache):
+    """
+    Load records through the compiled cache
+
+    Args:
+        filename: Source data file
+        kind: "quests" or "items" (stored in the cache to avoid mixups)
+        parse_file: Function that parses and validates the source file
+        use_cache: False to always parse the text file
+
+    Returns: Dictionary of records {record_id: record_dict}
+    """
+    if not use_cache:
+        return parse_file(filename)
+
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        # Let the parser raise the proper MissingDataFileError/CorruptedDataError
+        return parse_file(filename)
+
+    cached = _read_cache(filename, kind, stat)
+    if cached is not None:
+        return cached
+
+    data = parse_file(filename)
+    _write_cache(filename, kind, stat, data)
+    return data
+
+
+def clear_cache(filename):
+    """
+    Delete the compiled cache for a data file
+
+    Returns: True if a cache file was removed, False if there was none
+    """
+    cache_path = get_cache_path(filename)
+    if not os.path.exists(cache_path):
+        return False
+    os.remove(cache_path)
+    return True
+
+# ============================================================================
+# CONTENT PACKS
+# ============================================================================
+
+def find_pack_files(pack_path):
+    """
+    Resolve a content pack location into a sorted list of files
+
+    Args:
+        pack_path: A directory (every *.txt inside it is a pack) or a glob
+                   pattern such as "data/packs/*_items.txt"
+
+    Returns: Sorted list of file paths
+    """
+    if os.path.isdir(pack_path):
+        pattern = os.path.join(pack_path, "*.txt")
+    else:
+        pattern = pack_path
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def _load_pack_file(kind, filename):
+    """
+    Load one pack file (runs inside a worker process)
+
+    Returns: (filename, records, seconds) where records is the loader's dict
+    """
+    loader = load_quests if kind == "quests" else load_items
+    start = time.perf_counter()
+    records = loader(filename)
+    return filename, records, time.perf_counter() - start
+
+
+def load_content_packs(pack_path, kind="items", max_workers=None):
+    """
+    Load and merge many quest or item pack files in parallel
+
+    Each file is parsed in its own worker process (through the compiled
+    cache, so unchanged packs are cheap). Results are merged in file order.
+
+    Args:
+        pack_path: Directory or glob pattern of pack files
+        kind: "quests" or "items"
+        max_workers: Process pool size (None = one per CPU, 1 = no pool)
+
+    Returns: Tuple (records, timings)
+            records: merged dictionary {record_id: record_dict}
+            timings: dictionary {filename: parse_seconds}
+    Raises:
+        MissingDataFileError if no pack files match pack_path
+        InvalidDataFormatError if a pack is invalid or an ID appears twice,
+        either inside one pack or in more than one pack
+    """
+    if kind not in ("quests", "items"):
+        raise ValueError(f"Unknown content kind: {kind}")
+
+    files = find_pack_files(pack_path)
+    if not files:
+        raise MissingDataFileError(f"No content packs found: {pack_path}")
+
+    if max_workers == 1 or len(files) == 1:
+        results = [_load_pack_file(kind, filename) for filename in files]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_load_pack_file, [kind] * len(files), files))
+
+    records = {}
+    sources = {}
+    timings = {}
+
+    for filename, pack_records, seconds in results:
+        timings[filename] = seconds
+        for record_id, record in pack_records.items():
+            if record_id in records:
+                raise InvalidDataFormatError(
+                    f"Duplicate id {record_id} in {filename} "
+                    f"(already defined in {sources[record_id]})"
+                )
+            records[record_id] = record
+            sources[record_id] = filename
+
+    return records, timings
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class CatalogWatcher:
+    """
+    Keeps a quest or item catalog in sync with its data file
+
+    poll() compares the file's size/mtime with the last load. When the file
+    changed, only blocks whose text changed are parsed again; unchanged
+    blocks reuse their previous dictionaries. The new catalog is built on
+    the side and swapped in with a single assignment, so readers holding
+    watcher.records always see one complete version.
+
+    Usage:
+        watcher = CatalogWatcher("data/items.txt", "items")
+        all_items = watcher.records
+        if watcher.poll():
+            all_items = watcher.records
+    """
+
+    def __init__(self, filename, kind):
+        """Load filename for the first time (kind is "quests" or "items")"""
+        if kind not in ("quests", "items"):
+            raise ValueError(f"Unknown content kind: {kind}")
+
+        self.filename = filename
+        self.kind = kind
+        self.records = {}
+        self.version = 0
+        self.last_error = None
+        self._blocks = {}
+        self._signature = None
+        self._failed_signature = None
+
+        self.reload()
+
+    def _read_signature(self):
+        """Return (size, mtime_ns) of the data file"""
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            raise MissingDataFileError(f"Data file is not found: {self.filename}")
+        return stat.st_size, stat.st_mtime_ns
+
+    def reload(self):
+        """
+        Re-read the data file and swap in a new catalog version
+
+        Returns: Number of blocks that had to be parsed again
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+                (the current catalog is kept if reloading fails)
+        """
+        signature = self._read_signature()
+
+        if self.kind == "quests":
+            parse_block, validate, id_field = parse_quest_block, validate_quest_data, "quest_id"
+        else:
+            parse_block, validate, id_field = parse_item_block, prepare_item, "item_id"
+
+        blocks = _iter_blocks(
+            self.filename,
+            f"Data file is not found: {self.filename}",
+            f"Data file is unreadable: {self.filename}"
+        )
+
+        new_blocks = {}
+        numbered = []
+        parsed = 0
+
+        for start_line, block in blocks:
+            key = tuple(block)
+            record = self._blocks.get(key)
+            if record is None:
+                record = parse_block(block)
+                validate(record)
+                parsed += 1
+            new_blocks[key] = record
+            numbered.append((start_line, record))
+
+        # Same duplicate-ID rule as load_quests/load_items
+        records = _index_records(numbered, id_field, self.kind[:-1], self.filename)
+
+        #swap in the new version all at once
+        self._blocks = new_blocks
+        self.records = records
+        self._signature = signature
+        self.version += 1
+        self.last_error = None
+        self._failed_signature = None
+        return parsed
+
+    def poll(self):
+        """
+        Reload the catalog if the data file changed since the last load
+
+        Bad edits don't take the game down: the error is kept in
+        last_error, the previous catalog stays active and the same broken
+        file is not parsed again until it changes.
+
+        Returns: True if a new catalog version was swapped in
+        """
+        signature = None
+        try:
+            signature = self._read_signature()
+            if signature in (self._signature, self._failed_signature):
+                return False
+            self.reload()
+        except DataError as e:
+            self.last_error = e
+            self._failed_signature = signature
+            return False
+        return True
+
+# ============================================================================
+# MEMORY-MAPPED ITEM CATALOG
+# ============================================================================
+
+def get_index_path(filename):
+    """Return the path of the offsets index file for an item data file"""
+    return filename + INDEX_SUFFIX
+
+
+def build_item_index(filename):
+    """
+    Scan an item file and record where each item block lives
+
+    Only the ITEM_ID line of every block is looked at; the rest of the
+    record is left undecoded.
+
+    Returns: Dictionary {item_id: (start_offset, end_offset)} in file order
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    try:
+        f = open(filename, "rb")
+    except FileNotFoundError:
+        raise MissingDataFileError(f"Item data file is not found: {filename}")
+    except Exception:
+        raise CorruptedDataError(f"Item file is unreadable: {filename}")
+
+    offsets = {}
+    with f:
+        block_start = None
+        block_id = None
+        position = 0
+
+        for line in f:
+            stripped = line.strip()
+            if stripped == b"":
+                if block_start is not None:
+                    _add_index_entry(offsets, block_id, block_start, position)
+                    block_start = None
+                    block_id = None
+            else:
+                if block_start is None:
+                    block_start = position
+                if stripped.upper().startswith(b"ITEM_ID:"):
+                    block_id = stripped.split(b":", 1)[1].strip()
+            position += len(line)
+
+        if block_start is not None:
+            _add_index_entry(offsets, block_id, block_start, position)
+
+    return offsets
+
+
+def _add_index_entry(offsets, block_id, start, end):
+    """Add one block to an offsets index, rejecting bad or duplicate IDs"""
+    if not block_id:
+        raise InvalidDataFormatError(f"Item block at byte {start} has no ITEM_ID")
+    try:
+        item_id = block_id.decode("utf-8")
+    except UnicodeDecodeError:
+        raise CorruptedDataError(f"Item block at byte {start} is not valid text")
+    if item_id in offsets:
+        raise InvalidDataFormatError(f"Duplicate item id: {item_id}")
+    offsets[item_id] = (start, end)
+
+
+def _load_item_index(filename):
+    """
+    Return the offsets index for filename, rebuilding the index file if it
+    is missing or no longer matches the source size/mtime
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        raise MissingDataFileError(f"Item data file is not found: {filename}")
+
+    index_path = get_index_path(filename)
+    try:
+        with open(index_path, "rb") as f:
+            index = pickle.load(f)
+        if (index["version"] == INDEX_VERSION
+                and index["size"] == stat.st_size
+                and index["mtime_ns"] == stat.st_mtime_ns):
+            return index["offsets"]
+    except Exception:
+        pass
+
+    offsets = build_item_index(filename)
+
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "offsets": offsets
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, index_path)
+    except Exception:
+        # The index is only an optimization; keep the in-memory copy
+        if os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    return offsets
+
+
+class ItemCatalog(Mapping):
+    """
+    Read-only, lazily decoded view of an item data file
+
+    The file is memory-mapped, so every worker process on a host shares the
+    same page cache. An item is parsed and validated only the first time it
+    is looked up; after that the decoded dictionary is reused.
+
+    Usage:
+        with ItemCatalog("data/items.txt") as items:
+            sword = items["iron_sword"]
+    """
+
+    def __init__(self, filename="data/items.txt"):
+        """Open filename and load (or build) its offsets index"""
+        self.filename = filename
+        self._offsets = _load_item_index(filename)
+        self._decoded = {}
+        self._file = None
+        self._map = None
+
+        if self._offsets:
+            try:
+                self._file = open(filename, "rb")
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except Exception:
+                self.close()
+                raise CorruptedDataError(f"Item file is unreadable: {filename}")
+
+    def __getitem__(self, item_id):
+        """Return the item dictionary for item_id, decoding it on first use"""
+        item = self._decoded.get(item_id)
+        if item is not None:
+            return item
+
+        start, end = self._offsets[item_id]
+        if self._map is None:
+            raise CorruptedDataError(f"Item catalog is closed: {self.filename}")
+
+        try:
+            text = self._map[start:end].decode("utf-8")
+        except UnicodeDecodeError:
+            raise CorruptedDataError(f"Item {item_id} is not valid text")
+
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        item = prepare_item(parse_item_block(lines))
+
+        self._decoded[item_id] = item
+        return item
+
+    def __contains__(self, item_id):
+        return item_id in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def decoded_count(self):
+        """Return how many items have been decoded so far"""
+        return len(self._decoded)
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# ============================================================================
+# COLUMNAR ITEM TABLE
+# ============================================================================
+
+# Item types in type-code order (type code = index)
+ITEM_TYPES = ("weapon", "armor", "consumable")
+
+
+class ItemTable:
+    """
+    Struct-of-arrays copy of an item catalog for bulk queries
+
+    Every item is one row. Numbers live in parallel 64-bit array('q')
+    columns, so large costs and bonuses fit:
+        type_codes: index into ITEM_TYPES
+        costs: item cost
+        bonuses[stat]: total effect value for each stat in VALID_EFFECT_STATS
+
+    A per-stat column (rather than one stat/value pair per row) means a
+    query like "sort by strength bonus" reads one column directly.
+    select() is a plain scan over the columns; it is a standalone helper
+    for tools and scripts (the in-game shop uses inventory_system.ShopIndex).
+
+    Usage:
+        table = ItemTable(load_items())
+        table.select(item_type="weapon", max_cost=200, sort_by="strength",
+                     descending=True)
+    """
+
+    def __init__(self, items):
+        """Build the columns from a {item_id: item_dict} mapping"""
+        self.item_ids = []
+        self.rows = {}
+        self.type_codes = array("q")
+        self.costs = array("q")
+        self.bonuses = {stat: array("q") for stat in VALID_EFFECT_STATS}
+
+        for item_id, item in items.items():
+            self.rows[item_id] = len(self.item_ids)
+            self.item_ids.append(item_id)
+            self.type_codes.append(ITEM_TYPES.index(item["type"]))
+            self.costs.append(item["cost"])
+
+            effects = item.get("effects")
+            if effects is None:
+                effects = parse_effects(item["effect"])
+
+            row_bonus = dict.fromkeys(VALID_EFFECT_STATS, 0)
+            for stat_name, value in effects:
+                row_bonus[stat_name] += value
+            for stat in VALID_EFFECT_STATS:
+                self.bonuses[stat].append(row_bonus[stat])
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def __contains__(self, item_id):
+        return item_id in self.rows
+
+    def get_cost(self, item_id):
+        """Return the cost of an item"""
+        return self.costs[self.rows[item_id]]
+
+    def get_type(self, item_id):
+        """Return the type name of an item"""
+        return ITEM_TYPES[self.type_codes[self.rows[item_id]]]
+
+    def get_bonus(self, item_id, stat):
+        """Return how much an item adds to stat (0 if it doesn't touch it)"""
+        return self.bonuses[stat][self.rows[item_id]]
+
+    def select(self, item_type=None, min_cost=None, max_cost=None, stat=None,
+               sort_by=None, descending=False, limit=None):
+        """
+        Find items matching every given filter
+
+        Args:
+            item_type: Only items of this type
+            min_cost/max_cost: Inclusive cost range
+            stat: Only items with a non-zero bonus to this stat
+            sort_by: "cost" or a stat name; otherwise catalog order
+            descending: Reverse the sort order
+            limit: Maximum number of results
+
+        Returns: List of item IDs
+        """
+        rows = range(len(self.item_ids))
+
+        if item_type is not None:
+            if item_type not in ITEM_TYPES:
+                return []
+            code = ITEM_TYPES.index(item_type)
+            type_codes = self.type_codes
+            rows = [row for row in rows if type_codes[row] == code]
+        if min_cost is not None:
+            costs = self.costs
+            rows = [row for row in rows if costs[row] >= min_cost]
+        if max_cost is not None:
+            costs = self.costs
+            rows = [row for row in rows if costs[row] <= max_cost]
+        if stat is not None:
+            column = self.bonuses[stat]
+            rows = [row for row in rows if column[row] != 0]
 
-    return item
+        if sort_by is not None:
+            column = self.costs if sort_by == "cost" else self.bonuses[sort_by]
+            rows = sorted(rows, key=column.__getitem__, reverse=descending)
 
-    # TODO: Implement parsing logic
+        item_ids = self.item_ids
+        if limit is not None:
+            rows = rows[:limit]
+        return [item_ids[row] for row in rows]
 
 # ============================================================================
 # TESTING
@@ -9,64 +9,245 @@ AI Usage: [Document any AI assistance used]
 This module handles inventory management, item usage, and equipment.
 """
 
+from bisect import bisect_left, bisect_right
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
     InsufficientResourcesError,
-    InvalidItemTypeError
+    InvalidItemTypeError,
+    InvalidDataFormatError
 )
+from game_data import parse_effects
 
 # Maximum inventory size
 MAX_INVENTORY_SIZE = 20
 
+# ============================================================================
+# INVENTORY TYPE
+# ============================================================================
+
+class Inventory:
+    """
+    A character's items, stored as {item_id: count} instead of a flat list
+
+    "in", count, remove and len are constant time no matter how many
+    copies of an item the character carries. It still acts like the list
+    the rest of the game expects: append, remove, count, clear, len,
+    iteration and inventory[:] all work, and iterating yields every copy
+    (grouped by item, in the order each item was first added), which is
+    exactly what the save formats write out.
+
+    Items stack: up to max_stack copies of an item share one slot, and
+    slots (not copies) count towards MAX_INVENTORY_SIZE. An item's stack
+    size is learned when it's added with one (or via set_stack_limits);
+    until then every copy takes its own slot, like the old list did.
+
+    An inventory is a bag of items, so == against another Inventory or a
+    list compares how many of each item there are, not their order.
+
+    Costs to know about: the stack-limit dictionary is only created once
+    an item gets a stack size, and inventory[i] walks the item counts
+    (O(number of distinct items)) instead of copying the list, but
+    slicing (inventory[:]) still builds the full flat list.
+    """
+
+    __slots__ = ("_counts", "_size", "_slots", "_stack_limits")
+
+    def __init__(self, items=()):
+        self._counts = {}
+        self._size = 0
+        self._slots = 0
+        # item_id -> max_stack, None until an item gets a stack size
+        self._stack_limits = None
+        self.extend(items)
+
+    def _change(self, item_id, new_count):
+        """Set an item's count, keeping the size and slot totals current"""
+        old_count = self._counts.get(item_id, 0)
+        limit = self.stack_limit(item_id)
+        self._slots += -(-new_count // limit) - (-(-old_count // limit))
+        self._size += new_count - old_count
+        if new_count:
+            self._counts[item_id] = new_count
+        else:
+            del self._counts[item_id]
+
+    def stack_limit(self, item_id):
+        """How many copies of an item share one slot"""
+        if self._stack_limits is None:
+            return 1
+        return self._stack_limits.get(item_id, 1)
+
+    def set_stack_limit(self, item_id, max_stack):
+        """Set an item's stack size, re-counting the slots it takes"""
+        count = self._counts.get(item_id, 0)
+        old_limit = self.stack_limit(item_id)
+        if self._stack_limits is None:
+            self._stack_limits = {}
+        self._stack_limits[item_id] = max_stack = max(1, max_stack)
+        self._slots += -(-count // max_stack) - (-(-count // old_limit))
+
+    def slots_used(self):
+        """Number of inventory slots the stacks take up"""
+        return self._slots
+
+    def slots_needed(self, item_id, quantity=1):
+        """Extra slots that adding quantity copies of an item would take"""
+        count = self._counts.get(item_id, 0)
+        limit = self.stack_limit(item_id)
+        return -(-(count + quantity) // limit) - (-(-count // limit))
+
+    def add(self, item_id, quantity=1):
+        """Add quantity copies of an item"""
+        if quantity < 0:
+            raise ValueError("Quantity cannot be negative")
+        if quantity:
+            self._change(item_id, self._counts.get(item_id, 0) + quantity)
+
+    def append(self, item_id):
+        """Add one copy of an item (same as list.append)"""
+        self._change(item_id, self._counts.get(item_id, 0) + 1)
+
+    def extend(self, item_ids):
+        """Add every item in item_ids"""
+        for item_id in item_ids:
+            self.append(item_id)
+
+    def remove(self, item_id, quantity=1):
+        """
+        Remove quantity copies of an item
+
+        Raises: ValueError if there aren't that many (like list.remove)
+        """
+        count = self._counts.get(item_id, 0)
+        if quantity < 0 or count < quantity:
+            raise ValueError(f"Inventory does not hold {quantity} x {item_id}")
+        self._change(item_id, count - quantity)
+
+    def count(self, item_id):
+        """Number of copies of an item"""
+        return self._counts.get(item_id, 0)
+
+    def items(self):
+        """(item_id, count) pairs, in the order items were first added"""
+        return self._counts.items()
+
+    def clear(self):
+        self._counts.clear()
+        self._size = 0
+        self._slots = 0
+
+    def copy(self):
+        copy = Inventory()
+        if self._stack_limits is not None:
+            copy._stack_limits = dict(self._stack_limits)
+        for item_id, count in self._counts.items():
+            copy.add(item_id, count)
+        return copy
+
+    def to_list(self):
+        """The inventory as the flat list of item IDs used in save files"""
+        items = []
+        for item_id, count in self._counts.items():
+            items.extend([item_id] * count)
+        return items
+
+    def __contains__(self, item_id):
+        return item_id in self._counts
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for item_id, count in self._counts.items():
+            for _ in range(count):
+                yield item_id
+
+    def __getitem__(self, index):
+        # Slicing builds the flat list, kept for old callers
+        if isinstance(index, slice):
+            return self.to_list()[index]
+
+        # A single index walks the stacks, without building the list
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("Inventory index out of range")
+        for item_id, count in self._counts.items():
+            if index < count:
+                return item_id
+            index -= count
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self._counts == other._counts
+        if isinstance(other, (list, tuple)):
+            if len(other) != self._size:
+                return False
+            counts = {}
+            for item_id in other:
+                counts[item_id] = counts.get(item_id, 0) + 1
+            return counts == self._counts
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Inventory({self.to_list()!r})"
+
 # ============================================================================
 # INVENTORY MANAGEMENT
 # ============================================================================
 
-def add_item_to_inventory(character, item_id):
+def add_item_to_inventory(character, item_id, quantity=1, item_data=None):
     """
     Add an item to character's inventory
     
     Args:
         character: Character dictionary
         item_id: Unique item identifier
+        quantity: How many copies to add
+        item_data: Item information (optional), used for its max_stack
     
     Returns: True if added successfully
-    Raises: InventoryFullError if inventory is at max capacity
+    Raises: InventoryFullError if the items don't fit
     """
     inventory = character["inventory"]
+    _check_quantity(quantity)
+    _learn_stack_limit(inventory, item_id, item_data)
 
     #Check inventory capacity
-    if len(inventory) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("Inventory is full")
+    _check_space(character, item_id, quantity, "Inventory is full")
     
     # add item
-    inventory.append(item_id)
+    _give_items(inventory, item_id, quantity)
     return True
 
     # TODO: Implement adding items
     # Check if inventory is full (>= MAX_INVENTORY_SIZE)
     # Add item_id to character['inventory'] list
 
-def remove_item_from_inventory(character, item_id):
+def remove_item_from_inventory(character, item_id, quantity=1):
     """
     Remove an item from character's inventory
     
     Args:
         character: Character dictionary
         item_id: Item to remove
+        quantity: How many copies to remove
     
     Returns: True if removed successfully
     Raises: ItemNotFoundError if item not in inventory
+            InsufficientResourcesError if there are fewer than quantity
     """
     inventory = character["inventory"]
+    _check_quantity(quantity)
 
     # Check if item exists
     if item_id not in inventory:
         raise ItemNotFoundError(f"Item {item_id} not found in inventory")
     
-    # Remove item only one though
-    inventory.remove(item_id)
+    _take_items(inventory, item_id, quantity)
     return True
 
     # TODO: Implement item removal
@@ -100,9 +281,11 @@ def get_inventory_space_remaining(character):
     """
     Calculate how many more items can fit in inventory
     
+    Each stack of items takes one slot.
+
     Returns: Integer representing available slots
     """
-    return MAX_INVENTORY_SIZE - len(character["inventory"])
+    return MAX_INVENTORY_SIZE - get_slots_used(character)
     # TODO: Implement space calculation
 
 def clear_inventory(character):
@@ -124,7 +307,7 @@ def clear_inventory(character):
 # ITEM USAGE
 # ============================================================================
 
-def use_item(character, item_id, item_data):
+def use_item(character, item_id, item_data, qty=1):
     """
     Use a consumable item from inventory
     
@@ -132,6 +315,7 @@ def use_item(character, item_id, item_data):
         character: Character dictionary
         item_id: Item to use
         item_data: Item information dictionary from game_data
+        qty: How many to use at once (their effects add up)
     
     Item types and effects:
     - consumable: Apply effect and remove from inventory
@@ -140,27 +324,37 @@ def use_item(character, item_id, item_data):
     Returns: String describing what happened
     Raises: 
         ItemNotFoundError if item not in inventory
+        InsufficientResourcesError if there are fewer than qty
         InvalidItemTypeError if item type is not 'consumable'
     """
+    _check_quantity(qty)
+
         #  Check item exists
     if item_id not in character["inventory"]:
         raise ItemNotFoundError(f"{item_id} not found in inventory.")
+    if character["inventory"].count(item_id) < qty:
+        raise InsufficientResourcesError(f"You don't have {qty} x {item_id}.")
 
     #  Check item type
     if item_data["type"] != "consumable":
         raise InvalidItemTypeError(f"{item_id} is not a consumable item.")
 
-    #  Parse effect "stat:value"
-    stat_name, value = parse_item_effect(item_data["effect"])
+    #  Effects are pre-parsed at load time, scaled by how many are used
+    effects = get_item_effects(item_data)
+    if qty != 1:
+        effects = tuple((stat_name, value * qty) for stat_name, value in effects)
 
-    #  Apply effect
-    apply_stat_effect(character, stat_name, value)
+    #  Apply effects
+    for stat_name, value in effects:
+        apply_stat_effect(character, stat_name, value)
 
-    # Remove ONE copy of the item
-    character["inventory"].remove(item_id)
+    # Remove the used copies in one go
+    _take_items(character["inventory"], item_id, qty)
 
     item_name = item_data.get("name", item_id)
-    return f"You used {item_name} and gained +{value} {stat_name}!"
+    if qty != 1:
+        item_name = f"{qty} x {item_name}"
+    return f"You used {item_name} and gained {describe_effects(effects)}!"
     # TODO: Implement item usage
     # Check if character has the item
     # Check if item type is 'consumable'
@@ -178,6 +372,9 @@ def equip_weapon(character, item_id, item_data):
         item_data: Item information dictionary
     
     Weapon effect format: "strength:5" (adds 5 to strength)
+
+    The bonus lives in the character's "weapon" stat layer (see STAT
+    LAYERS), so swapping or unequipping removes exactly what was added.
     
     If character already has weapon equipped:
     - Unequip current weapon (remove bonus)
@@ -187,45 +384,10 @@ def equip_weapon(character, item_id, item_data):
     Raises:
         ItemNotFoundError if item not in inventory
         InvalidItemTypeError if item type is not 'weapon'
+        InventoryFullError if the old weapon has nowhere to go
     """
-    # Must have item
-    if item_id not in character["inventory"]:
-        raise ItemNotFoundError(f"{item_id} not found in inventory.")
-
-    # Must be a weapon
-    if item_data["type"] != "weapon":
-        raise InvalidItemTypeError(f"{item_id} is not a weapon.")
+    return _equip(character, item_id, item_data, "weapon")
 
-    # If a weapon is already equipped → unequip it
-    if "equipped_weapon" in character and character["equipped_weapon"] is not None:
-        
-        old_weapon_id = character["equipped_weapon"]
-
-        # Remove old weapon stat bonus
-        if "equipped_weapon_effect" in character:
-            old_stat, old_value = character["equipped_weapon_effect"]
-            apply_stat_effect(character, old_stat, -old_value)
-
-        # Add old weapon back to inventory
-        if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-            raise InventoryFullError("No space to unequip old weapon.")
-
-        character["inventory"].append(old_weapon_id)
-
-    # Parse new weapon effect
-    stat_name, value = parse_item_effect(item_data["effect"])
-
-    # Apply effect
-    apply_stat_effect(character, stat_name, value)
-
-    # Store new weapon
-    character["equipped_weapon"] = item_id
-    character["equipped_weapon_effect"] = (stat_name, value)
-
-    # Remove from inventory
-    character["inventory"].remove(item_id)
-
-    return f"You equipped {item_id} (+{value} {stat_name})."
     # TODO: Implement weapon equipping
     # Check item exists and is type 'weapon'
     # Handle unequipping current weapon if exists
@@ -252,52 +414,10 @@ def equip_armor(character, item_id, item_data):
     Raises:
         ItemNotFoundError if item not in inventory
         InvalidItemTypeError if item type is not 'armor'
+        InventoryFullError if the old armor has nowhere to go
     """
-        #  Must have the item
-    if item_id not in character["inventory"]:
-        raise ItemNotFoundError(f"{item_id} not found in inventory.")
-
-    #  Must be armor
-    if item_data["type"] != "armor":
-        raise InvalidItemTypeError(f"{item_id} is not armor.")
-
-    # If armor is already equipped → unequip it
-    if "equipped_armor" in character and character["equipped_armor"] is not None:
-        old_armor_id = character["equipped_armor"]
-        old_armor_data = item_data["all_items"][old_armor_id] if "all_items" in item_data else None
-
-        # Remove old armor stat bonus
-        if old_armor_data:
-            stat_name, value = parse_item_effect(old_armor_data["effect"])
-            apply_stat_effect(character, stat_name, -value)
+    return _equip(character, item_id, item_data, "armor")
 
-            # Clamp current health if max_health dropped below health
-            if stat_name == "max_health" and character["health"] > character["max_health"]:
-                character["health"] = character["max_health"]
-
-        # Add old armor back to inventory
-        if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-            raise InventoryFullError("No space to unequip old armor.")
-
-        character["inventory"].append(old_armor_id)
-
-    #  Parse new armor effect
-    stat_name, value = parse_item_effect(item_data["effect"])
-
-    #  Apply new armor stats
-    apply_stat_effect(character, stat_name, value)
-
-    # Clamp health again if max_health changed
-    if stat_name == "max_health" and character["health"] > character["max_health"]:
-        character["health"] = character["max_health"]
-
-    #  Save new armor as equipped
-    character["equipped_armor"] = item_id
-
-    #  Remove the item from inventory
-    character["inventory"].remove(item_id)
-
-    return f"You equipped {item_data['name']} (+{value} {stat_name})."
     # TODO: Implement armor equipping
     # Similar to equip_weapon but for armor
 
@@ -308,34 +428,7 @@ def unequip_weapon(character):
     Returns: Item ID that was unequipped, or None if no weapon equipped
     Raises: InventoryFullError if inventory is full
     """
-        #  Check if any weapon is equipped
-    if "equipped_weapon" not in character or character["equipped_weapon"] is None:
-        return None  # nothing to unequip
-
-    weapon_id = character["equipped_weapon"]
-
-    #  Fetch weapon data
-    # In game, ALL item_data lives in game_data
-    # So equipped items MUST be referenced from there.
-    # We'll assume character stores a reference to ALL item data.
-    weapon_data = character["all_items"][weapon_id]
-
-    #  Remove stat bonus from character
-    stat_name, value = parse_item_effect(weapon_data["effect"])
-    apply_stat_effect(character, stat_name, -value)   # subtract the bonus
-
-    #  Inventory must have space to store unequipped weapon
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("No space to return unequipped weapon.")
-
-    #  Add weapon back to inventory
-    character["inventory"].append(weapon_id)
-
-    #  Clear equipped_weapon
-    character["equipped_weapon"] = None
-
-    #  Return the weapon ID that was unequipped
-    return weapon_id
+    return _unequip(character, "weapon")
 
     # TODO: Implement weapon unequipping
     # Check if weapon is equipped
@@ -350,45 +443,193 @@ def unequip_armor(character):
     Returns: Item ID that was unequipped, or None if no armor equipped
     Raises: InventoryFullError if inventory is full
     """
-        #  Check if armor is equipped
-    if "equipped_armor" not in character or character["equipped_armor"] is None:
+    return _unequip(character, "armor")
+
+    # TODO: Implement armor unequipping
+
+def _equip(character, item_id, item_data, slot):
+    """Shared body of equip_weapon and equip_armor ("weapon" or "armor" slot)"""
+    #  Must have the item
+    if item_id not in character["inventory"]:
+        raise ItemNotFoundError(f"{item_id} not found in inventory.")
+
+    #  Must be the right kind of item
+    if item_data["type"] != slot:
+        raise InvalidItemTypeError(f"{item_id} is not {'a weapon' if slot == 'weapon' else 'armor'}.")
+
+    effects = get_item_effects(item_data)
+    old_item_id = character.get(f"equipped_{slot}")
+
+    # Check space for the old item before changing anything
+    if old_item_id is not None:
+        _check_space(character, old_item_id, 1, f"No space to unequip old {slot}.")
+
+    # Swapping layers takes the old bonus off and puts the new one on
+    set_stat_layer(character, slot, effects)
+    character["inventory"].remove(item_id)
+    if old_item_id is not None:
+        _give_items(character["inventory"], old_item_id, 1)
+    character[f"equipped_{slot}"] = item_id
+
+    return f"You equipped {item_data.get('name', item_id)} ({describe_effects(effects)})."
+
+def _unequip(character, slot):
+    """Shared body of unequip_weapon and unequip_armor"""
+    item_id = character.get(f"equipped_{slot}")
+    if item_id is None:
         return None  # nothing to unequip
 
-    armor_id = character["equipped_armor"]
+    #  Inventory must have space to store it
+    _check_space(character, item_id, 1, f"No space to return unequipped {slot}.")
 
-    #  Fetch armor data from all_items
-    armor_data = character["all_items"][armor_id]
+    # Dropping the layer removes exactly the bonus it added
+    set_stat_layer(character, slot, ())
+    _give_items(character["inventory"], item_id, 1)
+    character[f"equipped_{slot}"] = None
+    return item_id
 
-    #  Remove stat bonus
-    stat_name, value = parse_item_effect(armor_data["effect"])
+# ============================================================================
+# STAT LAYERS
+# ============================================================================
 
-    # Subtract the armor's stat bonus
-    apply_stat_effect(character, stat_name, -value)
+# Stats that equipment and buffs can modify. health is a pool that goes up
+# and down in combat, so an effect on it is applied once instead (and the
+# amount actually applied is taken back when the layer goes away).
+LAYERED_STATS = ("max_health", "strength", "magic")
 
-    #  If max_health dropped below current health → clamp
-    if stat_name == "max_health" and character["health"] > character["max_health"]:
-        character["health"] = character["max_health"]
+class StatLayers:
+    """
+    Stat modifiers stacked on top of a character's base stats
+
+    Each layer is a named tuple of (stat_name, value) effects: "weapon",
+    "armor", or "buff:<name>" for temporary buffs. The character's own
+    strength/magic/max_health fields always hold the effective value
+    (base + every layer), updated once whenever a layer changes, so
+    combat keeps reading character["strength"] with no extra work.
+    Because each layer remembers exactly what it added, removing it can
+    never drift, and base = field - modifier total at any time.
+
+    A health effect is applied to current health once, when the layer is
+    set. The layer remembers how much health that really added (after the
+    max_health cap) and takes it back when it is removed or replaced, so
+    putting gear on and off again never heals.
+
+    Stored on the character as character["stat_layers"].
+    """
 
-    #  Ensure inventory has space
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("No space to return unequipped armor.")
+    __slots__ = ("layers", "totals", "instant")
+
+    def __init__(self):
+        self.layers = {}
+        # stat -> sum of every layer, i.e. what the fields hold on top of base
+        self.totals = dict.fromkeys(LAYERED_STATS, 0)
+        # layer name -> health it added when it was set
+        self.instant = {}
+
+    def modifier(self, stat_name):
+        """Total bonus all layers add to a stat"""
+        return self.totals.get(stat_name, 0)
+
+    @staticmethod
+    def take_back_health(health, amount):
+        """health minus amount, but a living character keeps at least 1"""
+        if health <= 0:
+            return health
+        return max(1, health - amount)
+
+    def instant_health(self):
+        """Health all layers have added and will take back when removed"""
+        return sum(self.instant.values())
+
+    def set(self, character, name, effects):
+        """
+        Replace (or with no effects, remove) a layer and update the
+        character's effective stats by the difference
+
+        The old layer's health is taken back (a living character keeps at
+        least 1) before the new layer's health effect is applied.
+        """
+        layered = tuple((stat, value) for stat, value in effects if stat in LAYERED_STATS)
+        instant = tuple((stat, value) for stat, value in effects if stat not in LAYERED_STATS)
+
+        old_health = self.instant.pop(name, 0)
+        if old_health:
+            character["health"] = self.take_back_health(character["health"], old_health)
+
+        old = self.layers.pop(name, ())
+        if layered:
+            self.layers[name] = layered
+
+        change = {}
+        for stat, value in old:
+            change[stat] = change.get(stat, 0) - value
+        for stat, value in layered:
+            change[stat] = change.get(stat, 0) + value
+
+        for stat, delta in change.items():
+            if delta:
+                self.totals[stat] += delta
+                character[stat] += delta
+        if character["health"] > character["max_health"]:
+            character["health"] = character["max_health"]
+
+        added = 0
+        for stat, value in instant:
+            before = character["health"]
+            apply_stat_effect(character, stat, value)
+            added += character["health"] - before
+        if added:
+            self.instant[name] = added
+
+def get_stat_layers(character):
+    """Return the character's StatLayers, creating it on first use"""
+    layers = character.get("stat_layers")
+    if layers is None:
+        layers = character["stat_layers"] = StatLayers()
+    return layers
+
+def set_stat_layer(character, name, effects):
+    """
+    Put a named modifier layer on the character (empty effects remove it)
 
-    # Add armor back to inventory
-    character["inventory"].append(armor_id)
+    Effects on health aren't layered; they're applied once and taken back
+    when the layer is removed.
+    """
+    get_stat_layers(character).set(character, name, effects)
 
-    # Clear the equipped armor slot
-    character["equipped_armor"] = None
+def add_stat_buff(character, buff_name, effects):
+    """Add (or replace) a temporary buff, e.g. ("rage", (("strength", 4),))"""
+    set_stat_layer(character, f"buff:{buff_name}", effects)
 
-    # Return the unequipped armor's ID
-    return armor_id
+def remove_stat_buff(character, buff_name):
+    """Remove a temporary buff (no-op if it isn't active)"""
+    set_stat_layer(character, f"buff:{buff_name}", ())
 
-    # TODO: Implement armor unequipping
+def clear_stat_buffs(character):
+    """Remove every temporary buff, e.g. when a battle ends"""
+    layers = character.get("stat_layers")
+    if layers is None:
+        return
+    for name in [name for name in layers.layers if name.startswith("buff:")]:
+        set_stat_layer(character, name, ())
+
+def get_base_stats(character):
+    """
+    Stats without any equipment or buffs
+
+    Returns: Dictionary {stat_name: value} for LAYERED_STATS
+    """
+    layers = character.get("stat_layers")
+    return {
+        stat: character[stat] - (layers.modifier(stat) if layers is not None else 0)
+        for stat in LAYERED_STATS
+    }
 
 # ============================================================================
 # SHOP SYSTEM
 # ============================================================================
 
-def purchase_item(character, item_id, item_data):
+def purchase_item(character, item_id, item_data, qty=1):
     """
     Purchase an item from a shop
     
@@ -396,27 +637,29 @@ def purchase_item(character, item_id, item_data):
         character: Character dictionary
         item_id: Item to purchase
         item_data: Item information with 'cost' field
+        qty: How many to buy
     
     Returns: True if purchased successfully
     Raises:
         InsufficientResourcesError if not enough gold
         InventoryFullError if inventory is full
     """
-    cost = item_data["cost"]
+    _check_quantity(qty)
+    cost = item_data["cost"] * qty
 
     #  Check gold
     if character["gold"] < cost:
         raise InsufficientResourcesError("Not enough gold to purchase this item.")
 
-    #  Check inventory space
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("Inventory is full.")
+    #  Check inventory space (stacks with what's already there)
+    _learn_stack_limit(character["inventory"], item_id, item_data)
+    _check_space(character, item_id, qty, "Inventory is full.")
 
     #  Subtract gold
     character["gold"] -= cost
 
     #  Add item to inventory
-    character["inventory"].append(item_id)
+    _give_items(character["inventory"], item_id, qty)
 
     return True
 
@@ -426,7 +669,7 @@ def purchase_item(character, item_id, item_data):
     # Subtract gold from character
     # Add item to inventory
 
-def sell_item(character, item_id, item_data):
+def sell_item(character, item_id, item_data, qty=1):
     """
     Sell an item for half its purchase cost
     
@@ -434,19 +677,23 @@ def sell_item(character, item_id, item_data):
         character: Character dictionary
         item_id: Item to sell
         item_data: Item information with 'cost' field
+        qty: How many to sell
     
     Returns: Amount of gold received
     Raises: ItemNotFoundError if item not in inventory
+            InsufficientResourcesError if there are fewer than qty
     """
+    _check_quantity(qty)
+
         #  Check if character owns the item
     if item_id not in character["inventory"]:
         raise ItemNotFoundError(f"{item_id} not found in inventory.")
 
     #  Determine selling price
-    sell_price = item_data["cost"] // 2
+    sell_price = item_data["cost"] // 2 * qty
 
-    #  Remove the item from inventory
-    character["inventory"].remove(item_id)
+    #  Remove the items from inventory
+    _take_items(character["inventory"], item_id, qty)
 
     #  Add gold to the character
     character["gold"] += sell_price
@@ -460,10 +707,293 @@ def sell_item(character, item_id, item_data):
     # Remove item from inventory
     # Add gold to character
 
+class Cart:
+    """
+    A batch of buys and sells that is checked and applied all at once
+
+    Usage:
+        cart = Cart(all_items)
+        cart.buy("health_potion", 10)
+        cart.sell("iron_sword")
+        receipt = cart.checkout(character)
+
+    checkout sells first, then buys, so gold from the sales can pay for
+    the purchases and freed slots can hold them. If anything fails (not
+    enough gold, items or space) the character is left untouched.
+    """
+
+    def __init__(self, item_data_dict):
+        self.item_data_dict = item_data_dict
+        # item_id -> quantity, in the order they were added
+        self.buys = {}
+        self.sells = {}
+
+    def _item(self, item_id):
+        """Look up an item's data. Raises: ItemNotFoundError if unknown"""
+        if item_id not in self.item_data_dict:
+            raise ItemNotFoundError(f"{item_id} is not sold here.")
+        return self.item_data_dict[item_id]
+
+    def buy(self, item_id, qty=1):
+        """Add qty of an item to buy"""
+        _check_quantity(qty)
+        self._item(item_id)
+        self.buys[item_id] = self.buys.get(item_id, 0) + qty
+
+    def sell(self, item_id, qty=1):
+        """Add qty of an item to sell"""
+        _check_quantity(qty)
+        self._item(item_id)
+        self.sells[item_id] = self.sells.get(item_id, 0) + qty
+
+    def clear(self):
+        self.buys.clear()
+        self.sells.clear()
+
+    def totals(self):
+        """
+        Returns: Tuple (cost of all buys, gold from all sells)
+        """
+        cost = sum(self._item(item_id)["cost"] * qty for item_id, qty in self.buys.items())
+        earned = sum(self._item(item_id)["cost"] // 2 * qty for item_id, qty in self.sells.items())
+        return cost, earned
+
+    def checkout(self, character):
+        """
+        Apply every buy and sell, or none of them
+
+        Returns: Dictionary with spent, earned, gold (new total), and the
+                 bought and sold quantities
+        Raises:
+            ItemNotFoundError if an item to sell isn't in the inventory
+            InsufficientResourcesError if there's not enough gold, or
+                fewer items than the cart sells
+            InventoryFullError if the purchases don't fit
+        """
+        inventory = character["inventory"]
+        cost, earned = self.totals()
+
+        # Check everything first
+        for item_id, qty in self.sells.items():
+            if item_id not in inventory:
+                raise ItemNotFoundError(f"{item_id} not found in inventory.")
+            if inventory.count(item_id) < qty:
+                raise InsufficientResourcesError(f"You don't have {qty} x {item_id}.")
+
+        if character["gold"] + earned < cost:
+            raise InsufficientResourcesError("Not enough gold for everything in the cart.")
+
+        # Slots are checked on a scratch copy of the inventory
+        trial = {"inventory": inventory.copy() if isinstance(inventory, Inventory) else list(inventory)}
+        for item_id, qty in self.sells.items():
+            _take_items(trial["inventory"], item_id, qty)
+        for item_id, qty in self.buys.items():
+            _learn_stack_limit(trial["inventory"], item_id, self._item(item_id))
+            _give_items(trial["inventory"], item_id, qty)
+        if get_slots_used(trial) > MAX_INVENTORY_SIZE:
+            raise InventoryFullError("Not enough inventory space for everything in the cart.")
+
+        # Nothing can fail from here on
+        for item_id, qty in self.sells.items():
+            _take_items(inventory, item_id, qty)
+        for item_id, qty in self.buys.items():
+            _learn_stack_limit(inventory, item_id, self._item(item_id))
+            _give_items(inventory, item_id, qty)
+        character["gold"] += earned - cost
+
+        receipt = {
+            "spent": cost,
+            "earned": earned,
+            "gold": character["gold"],
+            "bought": dict(self.buys),
+            "sold": dict(self.sells),
+        }
+        self.clear()
+        return receipt
+
+class ShopIndex:
+    """
+    Pre-sorted views of an item catalog for filtered, paginated shop pages
+
+    Built once per catalog. For every (item type, effect stat) combination
+    (None meaning "any") the index keeps the matching item IDs sorted by
+    cost, next to a parallel list of their costs. A query picks one of
+    those lists, finds its cost range with a binary search, and slices out
+    one page, so the work per page doesn't grow with the catalog.
+    "Affordable" is just a cost range ending at the character's gold.
+
+    Usage:
+        index = ShopIndex(all_items)
+        page = index.query(item_type="weapon", page=2)
+        page = index.affordable(character, stat="strength", sort_by="strength",
+                                descending=True)
+        page["items"], page["page"], page["pages"], page["total"]
+    """
+
+    def __init__(self, items, page_size=10):
+        self.items = items
+        self.page_size = page_size
+        # (item_type or None, stat or None) -> (item IDs, costs), cheapest first
+        self.by_cost = {}
+        # (item_type or None, stat) -> item IDs, smallest stat bonus first
+        self.by_bonus = {}
+        # item_id -> {stat: total bonus}
+        self.bonuses = {}
+
+        for item_id, item in sorted(items.items(), key=lambda pair: (pair[1]["cost"], pair[0])):
+            bonuses = {}
+            for stat_name, value in get_item_effects(item):
+                bonuses[stat_name] = bonuses.get(stat_name, 0) + value
+            self.bonuses[item_id] = bonuses
+
+            stats = [None] + [stat_name for stat_name, value in bonuses.items() if value]
+            for item_type in (None, item["type"]):
+                for stat_name in stats:
+                    item_ids, costs = self.by_cost.setdefault((item_type, stat_name), ([], []))
+                    item_ids.append(item_id)
+                    costs.append(item["cost"])
+
+        for (item_type, stat_name), (item_ids, costs) in self.by_cost.items():
+            if stat_name is not None:
+                self.by_bonus[(item_type, stat_name)] = sorted(
+                    item_ids, key=lambda item_id: self.bonuses[item_id][stat_name])
+
+    def query(self, item_type=None, stat=None, min_cost=None, max_cost=None,
+              sort_by="cost", descending=False, page=1, page_size=None):
+        """
+        One page of items matching every given filter
+
+        Args:
+            item_type: Only items of this type ("weapon", "armor", "consumable")
+            stat: Only items that change this stat
+            min_cost/max_cost: Inclusive cost range
+            sort_by: "cost", or the same stat as the stat filter to sort
+                     by its bonus (cost ranges are then checked item by item)
+            descending: Most expensive / biggest bonus first
+            page: Page number, starting at 1
+            page_size: Items per page (default: the index's page_size)
+
+        Returns: Dictionary with items (list of item IDs on this page),
+                 page, pages (at least 1) and total (matching items)
+        Raises: ValueError for a bad page, page size or sort_by
+        """
+        page_size = page_size or self.page_size
+        if page < 1 or page_size < 1:
+            raise ValueError("Page and page size must be at least 1")
+
+        item_ids, costs = self.by_cost.get((item_type, stat), ([], []))
+        start = (page - 1) * page_size
+
+        if sort_by == "cost":
+            low = 0 if min_cost is None else bisect_left(costs, min_cost)
+            high = len(costs) if max_cost is None else bisect_right(costs, max_cost)
+            total = max(0, high - low)
+            if descending:
+                end = high - start
+                page_ids = item_ids[max(low, end - page_size):end][::-1] if end > low else []
+            else:
+                page_ids = item_ids[low + start:min(high, low + start + page_size)]
+        elif stat is not None and sort_by == stat:
+            ordered = self.by_bonus.get((item_type, stat), [])
+            if min_cost is not None or max_cost is not None:
+                low = float("-inf") if min_cost is None else min_cost
+                high = float("inf") if max_cost is None else max_cost
+                ordered = [item_id for item_id in ordered if low <= self.items[item_id]["cost"] <= high]
+            if descending:
+                ordered = ordered[::-1]
+            total = len(ordered)
+            page_ids = ordered[start:start + page_size]
+        else:
+            raise ValueError(f"Cannot sort shop items by {sort_by}")
+
+        return {
+            "items": page_ids,
+            "page": page,
+            "pages": max(1, -(-total // page_size)),
+            "total": total,
+        }
+
+    def affordable(self, character, **filters):
+        """query() limited to items the character has the gold for"""
+        max_cost = filters.pop("max_cost", None)
+        gold = character["gold"]
+        filters["max_cost"] = gold if max_cost is None else min(gold, max_cost)
+        return self.query(**filters)
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def get_slots_used(character):
+    """
+    Number of inventory slots in use
+
+    A plain list inventory uses one slot per item; an Inventory uses one
+    per stack.
+    """
+    inventory = character["inventory"]
+    if isinstance(inventory, Inventory):
+        return inventory.slots_used()
+    return len(inventory)
+
+def set_stack_limits(character, item_data_dict):
+    """
+    Apply every held item's max_stack from the item data
+
+    Stack sizes aren't stored in save files, so call this after loading a
+    character (or reloading the item data).
+    """
+    inventory = character["inventory"]
+    if not isinstance(inventory, Inventory):
+        return
+    for item_id, count in inventory.items():
+        if item_id in item_data_dict:
+            _learn_stack_limit(inventory, item_id, item_data_dict[item_id])
+
+def _learn_stack_limit(inventory, item_id, item_data):
+    """Record an item's max_stack in an Inventory if it isn't known yet"""
+    if item_data is None or not isinstance(inventory, Inventory):
+        return
+    max_stack = item_data.get("max_stack", 1)
+    if inventory.stack_limit(item_id) != max_stack:
+        inventory.set_stack_limit(item_id, max_stack)
+
+def _check_quantity(quantity):
+    """Raises: ValueError unless quantity is a positive integer"""
+    if not isinstance(quantity, int) or quantity < 1:
+        raise ValueError(f"Quantity must be a positive whole number, not {quantity}")
+
+def _check_space(character, item_id, quantity, message):
+    """Raises: InventoryFullError if quantity more copies don't fit"""
+    inventory = character["inventory"]
+    if isinstance(inventory, Inventory):
+        needed = inventory.slots_needed(item_id, quantity)
+    else:
+        needed = quantity
+    if get_slots_used(character) + needed > MAX_INVENTORY_SIZE:
+        raise InventoryFullError(message)
+
+def _give_items(inventory, item_id, quantity):
+    """Add quantity copies to an Inventory or a plain list"""
+    if isinstance(inventory, Inventory):
+        inventory.add(item_id, quantity)
+    else:
+        inventory.extend([item_id] * quantity)
+
+def _take_items(inventory, item_id, quantity):
+    """
+    Remove quantity copies from an Inventory or a plain list
+
+    Raises: InsufficientResourcesError if there are fewer than quantity
+    """
+    if inventory.count(item_id) < quantity:
+        raise InsufficientResourcesError(f"Not enough {item_id} in inventory.")
+    if isinstance(inventory, Inventory):
+        inventory.remove(item_id, quantity)
+    else:
+        for _ in range(quantity):
+            inventory.remove(item_id)
+
 def parse_item_effect(effect_string):
     """
     Parse item effect string into stat name and value
@@ -486,6 +1016,34 @@ def parse_item_effect(effect_string):
     # Split on ":"
     # Convert value to integer
 
+def get_item_effects(item_data):
+    """
+    Get an item's effects as a tuple of (stat_name, value) pairs
+
+    Items from game_data.load_items already carry a pre-parsed "effects"
+    tuple; hand-built item dictionaries only have the "effect" string,
+    which is parsed here instead.
+
+    Returns: Tuple such as (("strength", 5),)
+    Raises: InvalidItemTypeError if the effect string is malformed
+    """
+    effects = item_data.get("effects")
+    if effects is not None:
+        return effects
+
+    try:
+        return parse_effects(item_data["effect"])
+    except (InvalidDataFormatError, KeyError):
+        raise InvalidItemTypeError(f"Invalid effect format: {item_data.get('effect')}")
+
+def describe_effects(effects):
+    """
+    Format effects for messages
+
+    Example: (("strength", 5), ("magic", -2)) → "+5 strength, -2 magic"
+    """
+    return ", ".join(f"{value:+d} {stat_name}" for stat_name, value in effects)
+
 def apply_stat_effect(character, stat_name, value):
     """
     Apply a stat modification to character
@@ -527,13 +1085,17 @@ def display_inventory(character, item_data_dict):
 
     print("=== INVENTORY ===")
 
-    # Count all items
-    item_counts = {}
-    for item_id in inventory:
-        item_counts[item_id] = item_counts.get(item_id, 0) + 1
+    # Count all items (an Inventory already keeps the counts)
+    if isinstance(inventory, Inventory):
+        item_counts = inventory.items()
+    else:
+        item_counts = {}
+        for item_id in inventory:
+            item_counts[item_id] = item_counts.get(item_id, 0) + 1
+        item_counts = item_counts.items()
 
     # Display each item with info from item_data_dict
-    for item_id, count in item_counts.items():
+    for item_id, count in item_counts:
         item_info = item_data_dict[item_id]
         name = item_info["name"]
         item_type = item_info["type"]
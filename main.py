@@ -16,6 +16,7 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import save_store
 from custom_exceptions import *
 
 # ============================================================================
@@ -28,6 +29,18 @@ all_quests = {}
 all_items = {}
 game_running = False
 
+# Where characters are saved (swap for save_store.SQLiteSaveStore() to use SQLite).
+# Not wrapped in CachedSaveStore: loading must reread the save file, and
+# quitting must not write unsaved progress over it.
+save_backend = save_store.TextFileSaveStore()
+
+# Watchers that keep all_quests/all_items in sync with the data files
+quest_watcher = None
+item_watcher = None
+
+# Shop listing index, rebuilt whenever all_items is replaced
+shop_index = None
+
 # ============================================================================
 # MAIN MENU
 # ============================================================================
@@ -98,7 +111,7 @@ def new_game():
         print("Error creating character. Please try again.")
         return
     
-    character_manager.save_character(current_character)
+    save_backend.save(current_character)
     print("Character saved. Starting game...")
     game_loop()
     
@@ -120,8 +133,8 @@ def load_game():
     global current_character
     print("\n=== LOAD GAME ===")
 
-    # Get all saved character names
-    saved = character_manager.list_saved_characters()
+    # Get all saved characters (names plus level/class from the save index)
+    saved = save_backend.list_info()
 
     # If no saves exist
     if not saved:
@@ -130,8 +143,8 @@ def load_game():
 
     # Display list
     print("\nSaved Characters:")
-    for i, name in enumerate(saved, start=1):
-        print(f"{i}. {name}")
+    for i, info in enumerate(saved, start=1):
+        print(f"{i}. {info['name']} - Level {info['level']} {info['class']} ({info['gold']} gold)")
 
     # Ask player to choose one
     choice = input("\nEnter the number of the character to load: ").strip()
@@ -148,11 +161,12 @@ def load_game():
         print("Invalid selection.")
         return
 
-    selected_name = saved[choice - 1]
+    selected_name = saved[choice - 1]['name']
 
     # Try loading the character
     try:
-        current_character = character_manager.load_character(selected_name)
+        current_character = save_backend.load(selected_name)
+        inventory_system.set_stack_limits(current_character, all_items)
         print(f"\nLoaded character: {current_character['name']} the {current_character['class']}!")
     except CharacterNotFoundError:
         print("Save file not found.")
@@ -163,6 +177,9 @@ def load_game():
     except InvalidSaveDataError:
         print("Save data is invalid.")
         return
+    except SaveLockTimeoutError:
+        print("Save file is busy. Try again in a moment.")
+        return
 
     # Enter game loop
     game_loop()
@@ -188,6 +205,9 @@ def game_loop():
     game_running = True
 
     while game_running:
+        # Pick up any balance changes made to the data files
+        refresh_game_data()
+
         choice = game_menu()
         
         if choice == 1:
@@ -263,9 +283,16 @@ def view_character_stats():
     print(f"Experience: {char['experience']}")
     print(f"Gold: {char['gold']}")
     print()
-    print(f"Health: {char['health']} / {char['max_health']}")
-    print(f"Strength: {char['strength']}")
-    print(f"Magic: {char['magic']}")
+    # Equipment/buff bonuses are shown next to the effective value
+    base = inventory_system.get_base_stats(char)
+    def bonus(stat):
+        extra = char[stat] - base[stat]
+        return f" ({extra:+d} from equipment)" if extra else ""
+
+    print(f"Health: {char['health']} / {char['max_health']}{bonus('max_health')}")
+    print(f"Strength: {char['strength']}{bonus('strength')}")
+    print(f"Magic: {char['magic']}{bonus('magic')}")
+    print(f"Weapon: {char.get('equipped_weapon') or 'none'}  Armor: {char.get('equipped_armor') or 'none'}")
     print()
     print(f"Active Quests: {len(char['active_quests'])}")
     print(f"Completed Quests: {len(char['completed_quests'])}")
@@ -311,10 +338,13 @@ def view_inventory():
         # 1. USE ITEM
         if choice == "1":
             try:
-                result = inventory_system.use_item(current_character, item_id, item_data)
+                qty = ask_quantity()
+                result = inventory_system.use_item(current_character, item_id, item_data, qty)
                 print(result)
             except ItemNotFoundError:
                 print("You don't have that item.")
+            except InsufficientResourcesError:
+                print("You don't have that many.")
             except InvalidItemTypeError:
                 print("That item cannot be used.")
         
@@ -498,29 +528,85 @@ def explore():
     # Handle combat results (XP, gold, death)
     # Handle exceptions
 
+def get_shop_index():
+    """Return the shop index for the current item data, building it if needed"""
+    global shop_index
+    if shop_index is None or shop_index.items is not all_items:
+        shop_index = inventory_system.ShopIndex(all_items)
+    return shop_index
+
 def shop():
     """Shop menu for buying/selling items"""
     global current_character, all_items
+
+    # Listing filters, kept while the player stays in the shop
+    page = 1
+    item_type = None
+    affordable_only = False
+
     while True:
+        # Only the current page is looked up and formatted
+        index = get_shop_index()
+        filters = {"item_type": item_type, "page": page}
+        try:
+            if affordable_only:
+                listing = index.affordable(current_character, **filters)
+            else:
+                listing = index.query(**filters)
+        except ValueError:
+            page = 1
+            continue
+        if page > listing["pages"]:
+            page = listing["pages"]
+            continue
+
         print("\n=== SHOP ===")
         print(f"Your Gold: {current_character['gold']}")
-        print("\nItems for Sale:")
 
-        # Display items with cost and type
-        for item_id, item in all_items.items():
+        shown = item_type or "all items"
+        if affordable_only:
+            shown += ", affordable"
+        print(f"\nItems for Sale ({shown}) - page {listing['page']} of {listing['pages']}:")
+        for item_id in listing["items"]:
+            item = all_items[item_id]
             print(f"- {item_id}: {item['name']} ({item['type']}), Cost: {item['cost']}")
 
         print("\nOptions:")
         print("1. Buy Item")
         print("2. Sell Item")
-        print("3. Back")
+        print("3. Cart (buy and sell several items at once)")
+        print("4. Back")
+        print("N/P. Next/previous page   T. Filter by type   A. Toggle affordable only")
 
-        choice = input("Choose an option (1-3): ").strip()
+        choice = input("Choose an option: ").strip().lower()
+
+        # PAGING AND FILTERS
+        if choice == "n":
+            page += 1
+            continue
+        if choice == "p":
+            page = max(1, page - 1)
+            continue
+        if choice == "t":
+            wanted = input("Type (weapon/armor/consumable, blank for all): ").strip().lower()
+            item_type = wanted or None
+            page = 1
+            continue
+        if choice == "a":
+            affordable_only = not affordable_only
+            page = 1
+            continue
 
         # BACK
-        if choice == "3":
+        if choice == "4":
             return
 
+        # CART
+        if choice == "3":
+            shop_cart()
+            input("\nPress ENTER to continue...")
+            continue
+
         # BUY ITEM
         if choice == "1":
             item_id = input("Enter ITEM ID to buy: ").strip()
@@ -532,8 +618,9 @@ def shop():
             item_data = all_items[item_id]
 
             try:
-                inventory_system.purchase_item(current_character, item_id, item_data)
-                print(f"Purchased {item_data['name']}!")
+                qty = ask_quantity()
+                inventory_system.purchase_item(current_character, item_id, item_data, qty)
+                print(f"Purchased {qty} x {item_data['name']}!")
             except InsufficientResourcesError:
                 print("You do not have enough gold.")
             except InventoryFullError:
@@ -553,10 +640,13 @@ def shop():
             item_data = all_items[item_id]
 
             try:
-                gold_gained = inventory_system.sell_item(current_character, item_id, item_data)
-                print(f"Sold {item_data['name']} for {gold_gained} gold!")
+                qty = ask_quantity()
+                gold_gained = inventory_system.sell_item(current_character, item_id, item_data, qty)
+                print(f"Sold {qty} x {item_data['name']} for {gold_gained} gold!")
             except ItemNotFoundError:
                 print("You do not have that item in your inventory.")
+            except InsufficientResourcesError:
+                print("You don't have that many to sell.")
 
             input("\nPress ENTER to continue...")
             continue
@@ -570,10 +660,61 @@ def shop():
     # Options: Buy item, Sell item, Back
     # Handle exceptions from inventory_system
 
+def shop_cart():
+    """Collect several buys/sells, then check them out in one go"""
+    cart = inventory_system.Cart(all_items)
+    print("\nEnter 'buy ITEM_ID [QTY]' or 'sell ITEM_ID [QTY]', blank line to check out.")
+
+    while True:
+        line = input("> ").strip().split()
+        if not line:
+            break
+        if line[0] not in ("buy", "sell") or len(line) not in (2, 3):
+            print("Format: buy ITEM_ID [QTY] or sell ITEM_ID [QTY]")
+            continue
+        qty = int(line[2]) if len(line) == 3 and line[2].isdigit() else 1
+
+        try:
+            if line[0] == "buy":
+                cart.buy(line[1], qty)
+            else:
+                cart.sell(line[1], qty)
+        except ItemNotFoundError:
+            print("Item does not exist in shop.")
+        except ValueError:
+            print("Quantity must be at least 1.")
+
+    if not cart.buys and not cart.sells:
+        print("Cart is empty.")
+        return
+
+    cost, earned = cart.totals()
+    print(f"Total cost: {cost} gold, total from sales: {earned} gold")
+    if input("Check out? (y/n): ").strip().lower() != "y":
+        print("Cart discarded.")
+        return
+
+    try:
+        receipt = cart.checkout(current_character)
+        print(f"Done! You now have {receipt['gold']} gold.")
+    except ItemNotFoundError:
+        print("You don't own one of the items you're selling. Nothing was changed.")
+    except InsufficientResourcesError as e:
+        print(f"{e} Nothing was changed.")
+    except InventoryFullError:
+        print("Your inventory can't hold all of that. Nothing was changed.")
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def ask_quantity():
+    """Ask how many items to use/buy/sell (blank or invalid input means 1)"""
+    answer = input("Quantity (default 1): ").strip()
+    if answer.isdigit() and int(answer) > 0:
+        return int(answer)
+    return 1
+
 def save_game():
     """Save current game state"""
     global current_character
@@ -583,42 +724,90 @@ def save_game():
         return
 
     try:
-        character_manager.save_character(current_character)
+        save_backend.save(current_character)
         print("\nGame saved successfully!")
     except PermissionError:
         print("Error: You don't have permission to save the file.")
     except IOError:
         print("Error: Could not write save file. Check folder permissions.")
+    except SaveFileCorruptedError as e:
+        print(f"Error: Could not save the game - {e}")
+    except SaveLockTimeoutError:
+        print("Error: The save is busy in another game window. Try again in a moment.")
     # TODO: Implement save
     # Use character_manager.save_character()
     # Handle any file I/O exceptions
 
 def load_game_data():
     """Load all quest and item data from files"""
-    global all_quests, all_items
+    global all_quests, all_items, quest_watcher, item_watcher
     try:
         # Try loading quests and items
-        all_quests = game_data.load_quests()
-        all_items = game_data.load_items()
+        quest_watcher = game_data.CatalogWatcher("data/quests.txt", "quests")
+        item_watcher = game_data.CatalogWatcher("data/items.txt", "items")
 
     except MissingDataFileError:
         # If files don't exist, create defaults and reload
         print("Data files missing. Creating default files...")
         game_data.create_default_data_files()
 
-        all_quests = game_data.load_quests()
-        all_items = game_data.load_items()
+        quest_watcher = game_data.CatalogWatcher("data/quests.txt", "quests")
+        item_watcher = game_data.CatalogWatcher("data/items.txt", "items")
 
     except InvalidDataFormatError as e:
         print(f"Error: Invalid game data format - {e}")
         raise  # Stop program because bad data cannot be used
 
+    all_quests = quest_watcher.records
+    all_items = item_watcher.records
+
     # TODO: Implement data loading
     # Try to load quests with game_data.load_quests()
     # Try to load items with game_data.load_items()
     # Handle MissingDataFileError, InvalidDataFormatError
     # If files missing, create defaults with game_data.create_default_data_files()
 
+def refresh_game_data():
+    """
+    Swap in new quest/item data if the data files changed on disk
+
+    Returns: True if anything was reloaded
+    """
+    global all_quests, all_items
+
+    reloaded = False
+
+    if poll_data_watcher(quest_watcher, "quest"):
+        all_quests = quest_watcher.records
+        reloaded = True
+
+    if poll_data_watcher(item_watcher, "item"):
+        all_items = item_watcher.records
+        if current_character is not None:
+            inventory_system.set_stack_limits(current_character, all_items)
+        reloaded = True
+
+    return reloaded
+
+def poll_data_watcher(watcher, label):
+    """
+    Poll one data watcher, warning once about a bad edit
+
+    Returns: True if the watcher swapped in new data
+    """
+    if watcher is None:
+        return False
+
+    previous_error = watcher.last_error
+    if watcher.poll():
+        print(f"Reloaded {label} data (version {watcher.version}).")
+        return True
+
+    # Keep playing on the old data if the new file is broken
+    if watcher.last_error is not None and watcher.last_error is not previous_error:
+        print(f"Warning: {label} data not reloaded - {watcher.last_error}")
+    return False
+
 def handle_character_death():
     """Handle character death"""
     global current_character, game_running
@@ -0,0 +1,387 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Store Module
+
+Pluggable storage backends for saved characters.
+
+Every backend offers the same methods (save, load, list_names, delete and
+save_many), so the game can switch from one text file per character to a
+SQLite database without touching the rest of the code.
+"""
+
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+import character_manager
+from custom_exceptions import (
+    CharacterNotFoundError,
+    SaveFileCorruptedError
+)
+
+# Keys of each dictionary returned by list_info (also the valid sort keys)
+INFO_FIELDS = character_manager.SAVE_INFO_FIELDS
+
+# ============================================================================
+# STORE INTERFACE
+# ============================================================================
+
+class SaveStore:
+    """
+    Base class for character storage backends
+
+    Subclasses must implement every method below.
+    """
+
+    def save(self, character):
+        """Save one character. Returns: True if successful"""
+        raise NotImplementedError
+
+    def save_many(self, characters):
+        """Save several characters together. Returns: Number saved"""
+        raise NotImplementedError
+
+    def load(self, character_name):
+        """
+        Load one character
+
+        Returns: Character dictionary
+        Raises: CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError
+        """
+        raise NotImplementedError
+
+    def list_names(self):
+        """Returns: List of saved character names"""
+        raise NotImplementedError
+
+    def list_info(self, sort_by="name", descending=False):
+        """
+        List saved characters with name, class, level, gold, saved_at
+        and size, sorted by any of those keys
+
+        Returns: List of dictionaries
+        """
+        raise NotImplementedError
+
+    def delete(self, character_name):
+        """
+        Delete one character
+
+        Returns: True if deleted
+        Raises: CharacterNotFoundError if the character doesn't exist
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the store"""
+        pass
+
+# ============================================================================
+# TEXT FILE BACKEND
+# ============================================================================
+
+class TextFileSaveStore(SaveStore):
+    """
+    One {name}_save.txt file per character (the original format)
+
+    save_format picks the text or compact binary encoding for new saves;
+    either kind of file can always be loaded.
+    """
+
+    def __init__(self, save_directory="data/save_games",
+                 save_format=character_manager.DEFAULT_SAVE_FORMAT):
+        self.save_directory = save_directory
+        self.save_format = save_format
+
+    def save(self, character):
+        return character_manager.save_character(character, self.save_directory, self.save_format)
+
+    def save_many(self, characters):
+        return character_manager.save_characters(characters, self.save_directory, self.save_format)
+
+    def load(self, character_name):
+        return character_manager.load_character(character_name, self.save_directory)
+
+    def list_names(self):
+        return character_manager.list_saved_characters(self.save_directory)
+
+    def list_info(self, sort_by="name", descending=False):
+        return character_manager.list_saved_character_info(self.save_directory, sort_by, descending)
+
+    def delete(self, character_name):
+        return character_manager.delete_character(character_name, self.save_directory)
+
+# ============================================================================
+# SQLITE BACKEND
+# ============================================================================
+
+class SQLiteSaveStore(SaveStore):
+    """
+    All characters in one SQLite database, one row per character
+
+    The name is the primary key, so load, save and delete are index
+    lookups no matter how many characters exist. The database runs in WAL
+    mode so readers don't block the writer. Each row keeps the text save
+    format, plus class/level/gold columns for cheap listings.
+    """
+
+    def __init__(self, database_path="data/save_games/characters.db"):
+        directory = os.path.dirname(database_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.database_path = database_path
+        try:
+            self.connection = sqlite3.connect(database_path)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS characters ("
+                " name TEXT PRIMARY KEY,"
+                " class TEXT NOT NULL,"
+                " level INTEGER NOT NULL,"
+                " gold INTEGER NOT NULL,"
+                " saved_at REAL NOT NULL,"
+                " data TEXT NOT NULL"
+                ")"
+            )
+            self.connection.commit()
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Could not open save database: {e}")
+
+    @staticmethod
+    def _row(character):
+        """Build the column values for one character"""
+        return (
+            character['name'],
+            character['class'],
+            character['level'],
+            character['gold'],
+            time.time(),
+            character_manager.format_character_save(character)
+        )
+
+    def save(self, character):
+        self.save_many([character])
+        return True
+
+    def save_many(self, characters):
+        """Save every character in a single transaction"""
+        rows = [self._row(character) for character in characters]
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO characters (name, class, level, gold, saved_at, data)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Error saving characters: {e}")
+        return len(rows)
+
+    def load(self, character_name):
+        try:
+            row = self.connection.execute(
+                "SELECT data FROM characters WHERE name = ?", (character_name,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Could not read save database: {e}")
+
+        if row is None:
+            raise CharacterNotFoundError(f"No save found for {character_name}")
+        return character_manager.Character(character_manager.parse_character_save(row[0]))
+
+    def list_names(self):
+        try:
+            rows = self.connection.execute("SELECT name FROM characters ORDER BY name")
+            return [row[0] for row in rows]
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Could not read save database: {e}")
+
+    def list_info(self, sort_by="name", descending=False):
+        if sort_by not in INFO_FIELDS:
+            raise ValueError(f"Cannot sort saves by {sort_by}")
+
+        order = "DESC" if descending else "ASC"
+        try:
+            rows = self.connection.execute(
+                "SELECT name, class, level, gold, saved_at, length(data) AS size"
+                f" FROM characters ORDER BY {sort_by} {order}"
+            )
+            return [dict(zip(INFO_FIELDS, row)) for row in rows]
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Could not read save database: {e}")
+
+    def delete(self, character_name):
+        try:
+            with self.connection:
+                cursor = self.connection.execute(
+                    "DELETE FROM characters WHERE name = ?", (character_name,)
+                )
+        except sqlite3.Error as e:
+            raise SaveFileCorruptedError(f"Could not delete {character_name}: {e}")
+
+        if cursor.rowcount == 0:
+            raise CharacterNotFoundError(f"No save found for {character_name}")
+        return True
+
+    def close(self):
+        self.connection.close()
+
+# ============================================================================
+# CACHING WRAPPER
+# ============================================================================
+
+class CachedSaveStore(SaveStore):
+    """
+    Read-through LRU cache of loaded characters in front of another store
+
+    load hands back the cached character object, so repeated loads don't
+    touch the disk. The cache remembers what each character looked like
+    when it was last loaded or written, and only characters that changed
+    since then are written back: on save, on flush, or when they are
+    evicted to make room for max_size newer ones. A character is only
+    evicted once its write-back succeeded; if it fails, the character stays
+    cached (the cache may go over max_size), the error is kept in
+    last_error, and the next flush tries again.
+
+    Usage:
+        store = CachedSaveStore(TextFileSaveStore(), max_size=256)
+        hero = store.load("Aria")
+        hero['gold'] += 10
+        store.dirty_fields("Aria")   # {'gold'}
+        store.flush()                # one save_many for everything dirty
+    """
+
+    def __init__(self, backend, max_size=128):
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.backend = backend
+        self.max_size = max_size
+        # name -> character, least recently used first
+        self.characters = OrderedDict()
+        # name -> copy of the character as last loaded/written
+        self.clean = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.write_backs = 0
+        self.last_error = None
+
+    @staticmethod
+    def _snapshot(character):
+        """Copy a character deep enough to diff against later"""
+        copy = dict(character)
+        for field in character_manager.BINARY_LIST_FIELDS:
+            copy[field] = list(character[field])
+        return copy
+
+    def _remember(self, character, clean):
+        """Put a character in the cache, evicting the oldest if full"""
+        name = character['name']
+        self.characters[name] = character
+        self.characters.move_to_end(name)
+        if clean:
+            self.clean[name] = self._snapshot(character)
+
+        # Oldest first; never the character we were just handed
+        for old_name in list(self.characters):
+            if len(self.characters) <= self.max_size:
+                break
+            if old_name == name:
+                continue
+            old_character = self.characters[old_name]
+            if self.is_dirty(old_name, old_character):
+                try:
+                    self.backend.save(old_character)
+                except Exception as e:
+                    # Keep it (and its unsaved changes) for the next flush
+                    self.last_error = e
+                    continue
+                self.write_backs += 1
+            del self.characters[old_name]
+            self.clean.pop(old_name, None)
+            self.evictions += 1
+
+    def dirty_fields(self, character_name):
+        """
+        Returns: Set of fields changed since the character was last loaded
+                 or written (empty if clean or not cached)
+        """
+        character = self.characters.get(character_name)
+        if character is None:
+            return set()
+        snapshot = self.clean.get(character_name)
+        if snapshot is None:
+            return set(character_manager.CHARACTER_FIELDS)
+        return {field for field, operation, value in character_manager.diff_character(snapshot, character)}
+
+    def is_dirty(self, character_name, character=None):
+        """Returns: True if the cached character has unsaved changes"""
+        if character is None:
+            character = self.characters.get(character_name)
+            if character is None:
+                return False
+        snapshot = self.clean.get(character_name)
+        if snapshot is None:
+            return True
+        return bool(character_manager.diff_character(snapshot, character))
+
+    def save(self, character):
+        """Write the character now if it changed. Returns: True"""
+        self._remember(character, clean=False)
+        if self.is_dirty(character['name']):
+            self.backend.save(character)
+            self.write_backs += 1
+            self.clean[character['name']] = self._snapshot(character)
+        return True
+
+    def save_many(self, characters):
+        for character in characters:
+            self._remember(character, clean=False)
+        return self.flush()
+
+    def load(self, character_name):
+        character = self.characters.get(character_name)
+        if character is not None:
+            self.hits += 1
+            self.characters.move_to_end(character_name)
+            return character
+
+        self.misses += 1
+        character = self.backend.load(character_name)
+        self._remember(character, clean=True)
+        return character
+
+    def flush(self):
+        """
+        Write back every dirty cached character in one save_many
+
+        Returns: Number of characters written
+        """
+        dirty = [character for name, character in self.characters.items() if self.is_dirty(name, character)]
+        if not dirty:
+            return 0
+        self.backend.save_many(dirty)
+        self.write_backs += len(dirty)
+        for character in dirty:
+            self.clean[character['name']] = self._snapshot(character)
+        return len(dirty)
+
+    def list_names(self):
+        self.flush()
+        return self.backend.list_names()
+
+    def list_info(self, sort_by="name", descending=False):
+        self.flush()
+        return self.backend.list_info(sort_by, descending)
+
+    def delete(self, character_name):
+        self.characters.pop(character_name, None)
+        self.clean.pop(character_name, None)
+        return self.backend.delete(character_name)
+
+    def close(self):
+        self.flush()
+        self.backend.close()
@@ -37,6 +37,63 @@ def test_character_dead_exception():
     with pytest.raises(CharacterDeadError):
         character_manager.gain_experience(char, 50)
 
+def test_truncated_binary_save_exception(tmp_path):
+    """Test that a truncated binary save raises InvalidSaveDataError"""
+    char = character_manager.create_character("Truncated", "Mage")
+    data = character_manager.format_character_binary(char)
+
+    with open(character_manager.get_save_path("Truncated", str(tmp_path)), "wb") as f:
+        f.write(data[:-3])
+
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("Truncated", str(tmp_path))
+
+@pytest.mark.skipif(character_manager.fcntl is None, reason="needs fcntl")
+def test_save_lock_timeout_exception(tmp_path):
+    """Test that SaveLockTimeoutError is raised when a save stays locked"""
+    import threading
+
+    char = character_manager.create_character("Locked", "Rogue")
+    character_manager.save_character(char, str(tmp_path))
+
+    # Another "process" (a thread with its own lock file handle) is writing
+    locked = threading.Event()
+    release = threading.Event()
+    def writer():
+        with character_manager.save_file_lock("Locked", str(tmp_path)):
+            locked.set()
+            release.wait()
+    thread = threading.Thread(target=writer)
+    thread.start()
+    locked.wait()
+
+    try:
+        with pytest.raises(SaveLockTimeoutError):
+            with character_manager.save_file_lock("Locked", str(tmp_path), exclusive=False, timeout=0.05):
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+def test_unknown_save_sort_key_exception(tmp_path):
+    """Test that listing saves by an unknown field raises ValueError"""
+    character_manager.save_character(character_manager.create_character("Sorted", "Mage"), str(tmp_path))
+
+    with pytest.raises(ValueError):
+        character_manager.list_saved_character_info(str(tmp_path), sort_by="luck")
+
+@pytest.mark.skipif(character_manager.fcntl is None, reason="needs fcntl")
+def test_unopenable_lock_file_exception(tmp_path):
+    """Test that a lock file that can't be opened raises SaveFileCorruptedError"""
+    # A plain file where the lock directory should be
+    (tmp_path / character_manager.LOCK_DIRNAME).write_text("")
+    heroes = [character_manager.create_character("LockedOut", "Mage")]
+
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.save_characters(heroes, str(tmp_path))
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.save_character(heroes[0], str(tmp_path))
+
 # ============================================================================
 # INVENTORY EXCEPTION TESTS
 # ============================================================================
@@ -72,6 +129,42 @@ def test_invalid_item_type_exception():
     with pytest.raises(InvalidItemTypeError):
         inventory_system.use_item(char, "weapon1", item_data)
 
+def test_item_quantity_exceptions():
+    """Test quantity checks when using, selling and buying stacks"""
+    item = {'type': 'consumable', 'effect': 'health:20', 'cost': 10, 'max_stack': 5}
+    char = {'inventory': inventory_system.Inventory(['health_potion'] * 3),
+            'gold': 1000, 'health': 10, 'max_health': 100}
+
+    with pytest.raises(InsufficientResourcesError):
+        inventory_system.use_item(char, 'health_potion', item, qty=4)
+    with pytest.raises(InsufficientResourcesError):
+        inventory_system.sell_item(char, 'health_potion', item, qty=4)
+    with pytest.raises(ValueError):
+        inventory_system.purchase_item(char, 'health_potion', item, qty=0)
+
+    # 5 per stack: 3 + 98 potions need 21 slots
+    with pytest.raises(InventoryFullError):
+        inventory_system.purchase_item(char, 'health_potion', item, qty=98)
+    assert char['gold'] == 1000 and char['health'] == 10
+
+def test_cart_inventory_full_exception():
+    """Test that a cart that doesn't fit raises InventoryFullError and changes nothing"""
+    items = {
+        'sword': {'type': 'weapon', 'effect': 'strength:1', 'cost': 10, 'max_stack': 1},
+        'potion': {'type': 'consumable', 'effect': 'health:5', 'cost': 4, 'max_stack': 10},
+    }
+    char = {'inventory': ['potion'] * (inventory_system.MAX_INVENTORY_SIZE - 1), 'gold': 100}
+
+    cart = inventory_system.Cart(items)
+    cart.sell('potion')
+    cart.buy('sword', 3)
+    with pytest.raises(InventoryFullError):
+        cart.checkout(char)
+    assert char['gold'] == 100 and len(char['inventory']) == inventory_system.MAX_INVENTORY_SIZE - 1
+
+    with pytest.raises(ItemNotFoundError):
+        cart.buy('dragon_egg')
+
 # ============================================================================
 # QUEST HANDLER EXCEPTION TESTS
 # ============================================================================
@@ -160,6 +253,14 @@ def test_invalid_data_format_exception():
     finally:
         os.remove("test_bad_data.txt")
 
+def test_block_parser_rejects_bad_numbers():
+    """Test that the block tokenizer raises InvalidDataFormatError for bad typed fields"""
+    with pytest.raises(InvalidDataFormatError):
+        game_data.parse_item_block(["ITEM_ID: x", "COST: lots"])
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.parse_quest_block(["QUEST_ID: x", "REWARD_XP: 10"])
+
 # ============================================================================
 # COMBAT EXCEPTION TESTS
 # ============================================================================
@@ -40,6 +40,397 @@ def test_character_creation_and_saving():
     # Cleanup
     character_manager.delete_character("IntegrationTest")
 
+def test_slotted_character_dict_protocol():
+    """Test that Character keeps the dictionary protocol the modules rely on"""
+    char = character_manager.create_character("SlotTest", "Cleric")
+
+    assert isinstance(char, character_manager.Character)
+    assert not hasattr(char, '__dict__')
+    assert char['class'] == "Cleric" and char.character_class == "Cleric"
+
+    char['gold'] += 10
+    assert char.gold == 110
+    assert 'equipped_weapon' not in char
+    char['equipped_weapon'] = "iron_sword"
+    assert char.get('equipped_weapon') == "iron_sword"
+    assert dict(char)['equipped_weapon'] == "iron_sword"
+    assert char == dict(char)
+    assert character_manager.validate_character_data(char) == True
+
+def test_group_commit_saves(tmp_path):
+    """Test that batched saves write every character and leave no temp files"""
+    save_dir = str(tmp_path)
+    heroes = [character_manager.create_character(f"Batch{i}", "Rogue") for i in range(5)]
+
+    batch = character_manager.SaveBatch(save_dir)
+    for hero in heroes:
+        batch.mark_dirty(hero)
+    heroes[0]['gold'] = 999
+    batch.mark_dirty(heroes[0])
+
+    assert batch.flush() == 5
+    saved_files = [name for name in os.listdir(save_dir) if name.endswith("_save.txt")]
+    assert sorted(saved_files) == sorted(f"Batch{i}_save.txt" for i in range(5))
+    assert not [name for name in os.listdir(save_dir) if name.endswith(".tmp")]
+    assert character_manager.load_character("Batch0", save_dir)['gold'] == 999
+
+    # Duplicate names in one group commit: the last one wins
+    stale = character_manager.create_character("Batch1", "Rogue")
+    fresh = character_manager.create_character("Batch1", "Rogue")
+    fresh['gold'] = 42
+    assert character_manager.save_characters([stale, heroes[2], fresh], save_dir) == 2
+    assert character_manager.load_character("Batch1", save_dir)['gold'] == 42
+    assert not [name for name in os.listdir(save_dir) if name.endswith(".tmp")]
+
+@pytest.mark.skipif(character_manager.fcntl is None, reason="needs fcntl")
+def test_group_commit_lock_count_is_bounded(tmp_path):
+    """Test that a huge batch holds at most LOCK_STRIPES locks at once"""
+    import resource
+
+    save_dir = str(tmp_path)
+    heroes = [character_manager.create_character(f"Crowd{i}", "Warrior") for i in range(400)]
+
+    # One descriptor per character would run out long before 400
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(150, hard), hard))
+    try:
+        assert character_manager.save_characters(heroes, save_dir) == 400
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+    lock_dir = os.path.join(save_dir, character_manager.LOCK_DIRNAME)
+    assert len(os.listdir(lock_dir)) <= character_manager.LOCK_STRIPES + 1
+
+    # Deleting leaves no per-character lock files behind
+    character_manager.delete_character("Crowd0", save_dir)
+    assert not [name for name in os.listdir(save_dir) if name.endswith(".lock")]
+
+def test_save_store_backends(tmp_path):
+    """Test that the text and SQLite stores behave the same way"""
+    import save_store
+    from custom_exceptions import CharacterNotFoundError
+
+    stores = [
+        save_store.TextFileSaveStore(str(tmp_path / "text")),
+        save_store.SQLiteSaveStore(str(tmp_path / "saves.db")),
+        save_store.CachedSaveStore(save_store.TextFileSaveStore(str(tmp_path / "cached"))),
+    ]
+    for store in stores:
+        hero = character_manager.create_character("StoreHero", "Cleric")
+        hero['inventory'] = ['health_potion', 'iron_sword']
+        other = character_manager.create_character("OtherHero", "Mage")
+
+        assert store.save_many([hero, other]) == 2
+        assert sorted(store.list_names()) == ["OtherHero", "StoreHero"]
+        assert [info['name'] for info in store.list_info(sort_by="class")] == ["StoreHero", "OtherHero"]
+        assert store.load("StoreHero") == hero
+
+        assert store.delete("OtherHero") == True
+        with pytest.raises(CharacterNotFoundError):
+            store.load("OtherHero")
+        store.close()
+
+def test_cached_save_store_write_back(tmp_path):
+    """Test that the character cache only writes back changed characters"""
+    import save_store
+    from custom_exceptions import SaveFileCorruptedError
+
+    text_store = save_store.TextFileSaveStore(str(tmp_path))
+    for name in ["CacheA", "CacheB", "CacheC"]:
+        text_store.save(character_manager.create_character(name, "Warrior"))
+
+    cache = save_store.CachedSaveStore(text_store, max_size=2)
+    hero = cache.load("CacheA")
+    assert cache.load("CacheA") is hero
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Unchanged characters are never rewritten
+    assert cache.flush() == 0
+    cache.save(hero)
+    assert cache.write_backs == 0
+
+    hero['gold'] += 40
+    hero['inventory'].append('iron_sword')
+    assert cache.dirty_fields("CacheA") == {'gold', 'inventory'}
+
+    # Loading two more evicts CacheA, which writes it back
+    cache.load("CacheB")
+    cache.load("CacheC")
+    assert cache.evictions == 1 and cache.write_backs == 1
+    assert text_store.load("CacheA") == hero
+
+    cache.load("CacheC")['level'] = 5
+    assert cache.flush() == 1
+    assert text_store.load("CacheC")['level'] == 5
+
+    # A failed write-back keeps the dirty character cached for the next flush
+    failing = {"save": True}
+    real_save = text_store.save
+    def flaky_save(character):
+        if failing["save"]:
+            raise SaveFileCorruptedError("disk full")
+        return real_save(character)
+    text_store.save = flaky_save
+
+    cache = save_store.CachedSaveStore(text_store, max_size=1)
+    cache.load("CacheB")['gold'] = 1234
+    assert cache.load("CacheA")['name'] == "CacheA"
+    assert isinstance(cache.last_error, SaveFileCorruptedError)
+    assert cache.is_dirty("CacheB") and cache.evictions == 0
+
+    failing["save"] = False
+    assert cache.flush() == 1
+    assert text_store.load("CacheB")['gold'] == 1234
+
+@pytest.mark.skipif(character_manager.fcntl is None, reason="needs fcntl")
+def test_save_file_locking(tmp_path):
+    """Test that readers share the save lock and writers wait for them"""
+    import threading
+    import time
+
+    save_dir = str(tmp_path)
+    hero = character_manager.create_character("LockHero", "Cleric")
+    character_manager.save_character(hero, save_dir)
+
+    reading = threading.Event()
+    def slow_reader():
+        with character_manager.save_file_lock("LockHero", save_dir, exclusive=False):
+            reading.set()
+            time.sleep(0.1)
+    thread = threading.Thread(target=slow_reader)
+    thread.start()
+    reading.wait()
+
+    # Another reader gets in straight away, the writer has to wait
+    character_manager.reset_lock_stats()
+    assert character_manager.load_character("LockHero", save_dir) == hero
+    assert character_manager.get_lock_stats()['contended'] == 0
+
+    hero['gold'] = 7
+    character_manager.save_character(hero, save_dir)
+    thread.join()
+
+    stats = character_manager.get_lock_stats()
+    assert stats['contended'] == 1 and stats['timeouts'] == 0
+    assert stats['max_wait_seconds'] > 0
+    assert character_manager.load_character("LockHero", save_dir)['gold'] == 7
+
+@pytest.mark.skipif(character_manager.fcntl is None, reason="needs fcntl")
+def test_read_only_save_directory(tmp_path, monkeypatch):
+    """Test that saves can be read where no lock file can be created"""
+    from custom_exceptions import SaveFileCorruptedError
+
+    save_dir = str(tmp_path)
+    hero = character_manager.create_character("ReadOnlyHero", "Mage")
+    with open(character_manager.get_save_path("ReadOnlyHero", save_dir), "w") as f:
+        f.write(character_manager.format_character_save(hero))
+
+    # Pretend the directory is read-only: nothing can be created in it
+    real_open = os.open
+    def read_only_open(path, flags, *args):
+        if flags & os.O_CREAT:
+            raise PermissionError(13, "Read-only file system", path)
+        return real_open(path, flags, *args)
+    monkeypatch.setattr(os, "open", read_only_open)
+    monkeypatch.setattr(os, "makedirs", lambda *args, **kwargs: read_only_open(save_dir, os.O_CREAT))
+
+    assert character_manager.load_character("ReadOnlyHero", save_dir) == hero
+    assert character_manager.list_saved_characters(save_dir) == ["ReadOnlyHero"]
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.save_character(hero, save_dir)
+
+def test_sharded_save_layout_migration(tmp_path):
+    """Test migrating a flat save directory to hashed shard folders"""
+    save_dir = str(tmp_path)
+    heroes = [character_manager.create_character(f"ShardHero{i}", "Mage") for i in range(4)]
+    character_manager.save_characters(heroes, save_dir)
+    heroes[0]['gold'] = 5
+    character_manager.save_character_incremental(heroes[0], save_dir)
+    # Per-save lock files left by older versions, one of them orphaned
+    for name in ("ShardHero1_save.txt.lock", "Gone_save.txt.lock"):
+        open(os.path.join(save_dir, name), "w").close()
+
+    assert character_manager.migrate_save_directory(save_dir) == 4
+    assert not [name for folder, subfolders, names in os.walk(save_dir)
+                for name in names if name.endswith("_save.txt.lock")]
+    assert character_manager.get_save_layout(save_dir) == "sharded"
+    assert not any(name.endswith("_save.txt") for name in os.listdir(save_dir))
+
+    first, second = character_manager.get_shard("ShardHero0")
+    assert character_manager.get_save_path("ShardHero0", save_dir) == os.path.join(
+        save_dir, first, second, "ShardHero0_save.txt")
+
+    # Journals move with their saves, and everything keeps working
+    assert character_manager.load_character("ShardHero0", save_dir) == heroes[0]
+    character_manager.save_character(character_manager.create_character("NewHero", "Rogue"), save_dir)
+    character_manager.delete_character("ShardHero3", save_dir)
+    os.remove(character_manager.get_manifest_path(save_dir))
+    assert sorted(character_manager.list_saved_characters(save_dir)) == [
+        "NewHero", "ShardHero0", "ShardHero1", "ShardHero2"]
+
+    # Running it again is harmless, and it can go back to flat
+    assert character_manager.migrate_save_directory(save_dir) == 0
+    assert character_manager.migrate_save_directory(save_dir, "flat") == 4
+    assert character_manager.load_character("ShardHero0", save_dir)['gold'] == 5
+
+def test_save_manifest_listing(tmp_path):
+    """Test that the save manifest tracks saves and deletes"""
+    save_dir = str(tmp_path)
+
+    # A save made before the manifest existed must still be listed
+    old = character_manager.create_character("OldHero", "Warrior")
+    with open(character_manager.get_save_path("OldHero", save_dir), "w") as f:
+        f.write(character_manager.format_character_save(old))
+
+    strong = character_manager.create_character("StrongHero", "Mage")
+    strong['level'] = 7
+    character_manager.save_character(strong, save_dir)
+
+    info = character_manager.list_saved_character_info(save_dir, sort_by="level", descending=True)
+    assert [(entry['name'], entry['level'], entry['class']) for entry in info] == [
+        ("StrongHero", 7, "Mage"), ("OldHero", 1, "Warrior")
+    ]
+
+    character_manager.delete_character("OldHero", save_dir)
+    assert character_manager.list_saved_characters(save_dir) == ["StrongHero"]
+
+def test_save_manifest_log_compaction(tmp_path, monkeypatch):
+    """Test that saves append to the manifest log and compaction folds it in"""
+    save_dir = str(tmp_path)
+    monkeypatch.setattr(character_manager, "MANIFEST_COMPACT_MIN_BYTES", 1_000_000)
+    heroes = [character_manager.create_character(f"LogHero{i}", "Rogue") for i in range(3)]
+    character_manager.save_characters(heroes, save_dir)
+
+    snapshot_before = open(character_manager.get_manifest_path(save_dir)).read()
+    heroes[0]['gold'] = 77
+    character_manager.save_character(heroes[0], save_dir)
+    character_manager.delete_character("LogHero1", save_dir)
+
+    # Only the log changed, and readers see both updates
+    assert open(character_manager.get_manifest_path(save_dir)).read() == snapshot_before
+    manifest = character_manager.read_save_manifest(save_dir)
+    assert sorted(manifest) == ["LogHero0", "LogHero2"]
+    assert manifest["LogHero0"]["gold"] == 77
+
+    assert character_manager.compact_save_manifest(save_dir) == manifest
+    assert not os.path.exists(character_manager.get_manifest_log_path(save_dir))
+    assert character_manager.read_save_manifest(save_dir) == manifest
+
+    # A torn log line makes listing fall back to a rescan
+    with open(character_manager.get_manifest_log_path(save_dir), "a") as f:
+        f.write('{"name": "Lo')
+    assert character_manager.read_save_manifest(save_dir) is None
+    assert [entry['name'] for entry in character_manager.list_saved_character_info(save_dir)] == [
+        "LogHero0", "LogHero2"]
+
+def test_binary_save_format(tmp_path):
+    """Test that binary saves round-trip, are smaller, and are detected on load"""
+    save_dir = str(tmp_path)
+    hero = character_manager.create_character("BinaryHero", "Rogue")
+    hero['inventory'] = ['health_potion'] * 10 + ['iron_sword']
+    hero['completed_quests'] = ['first_steps', 'goblin_hunter']
+
+    text_size = len(character_manager.encode_character_save(hero, "text"))
+    character_manager.save_character(hero, save_dir, save_format="binary")
+    binary_size = os.path.getsize(character_manager.get_save_path("BinaryHero", save_dir))
+
+    assert binary_size < text_size
+    assert character_manager.load_character("BinaryHero", save_dir) == hero
+
+    # Journal fallbacks and compaction keep the save binary
+    def is_binary():
+        with open(character_manager.get_save_path("BinaryHero", save_dir), "rb") as f:
+            return f.read(4) == character_manager.BINARY_SAVE_MAGIC
+
+    hero['gold'] += 5
+    character_manager.save_character_incremental(hero, save_dir)
+    character_manager.compact_character("BinaryHero", save_dir)
+    assert is_binary()
+
+    character_manager._saved_state.clear()
+    hero['gold'] += 5
+    character_manager.save_character_incremental(hero, save_dir)
+    assert is_binary()
+    assert character_manager.load_character("BinaryHero", save_dir) == hero
+
+def test_journal_incremental_saves(tmp_path):
+    """Test that incremental saves append small changes and replay on load"""
+    save_dir = str(tmp_path)
+    hero = character_manager.create_character("JournalHero", "Warrior")
+    character_manager.save_character(hero, save_dir)
+    snapshot_size = os.path.getsize(character_manager.get_save_path("JournalHero", save_dir))
+
+    hero['gold'] -= 25
+    hero['inventory'].append('health_potion')
+    assert character_manager.save_character_incremental(hero, save_dir) == True
+    assert character_manager.save_character_incremental(hero, save_dir) == False
+
+    hero['active_quests'].append('first_steps')
+    character_manager.save_character_incremental(hero, save_dir)
+
+    # Snapshot untouched, changes live in the journal
+    assert os.path.getsize(character_manager.get_save_path("JournalHero", save_dir)) == snapshot_size
+    assert character_manager.load_character("JournalHero", save_dir) == hero
+
+    # Compaction folds the journal into a new snapshot
+    character_manager.compact_character("JournalHero", save_dir)
+    assert not os.path.exists(character_manager.get_journal_path("JournalHero", save_dir))
+    assert character_manager.load_character("JournalHero", save_dir) == hero
+
+def test_saved_state_only_tracks_incremental_saves(tmp_path, monkeypatch):
+    """Test that plain saves and loads keep no copies, and tracking is capped"""
+    save_dir = str(tmp_path)
+    character_manager._saved_state.clear()
+    heroes = [character_manager.create_character(f"Tracked{i}", "Mage") for i in range(6)]
+    character_manager.save_characters(heroes, save_dir)
+    for hero in heroes:
+        character_manager.load_character(hero['name'], save_dir)
+    assert len(character_manager._saved_state) == 0
+
+    # Incremental saves read their starting point back from disk
+    monkeypatch.setattr(character_manager, "SAVED_STATE_LIMIT", 4)
+    for hero in heroes:
+        hero['gold'] += 1
+        assert character_manager.save_character_incremental(hero, save_dir) == True
+        assert os.path.exists(character_manager.get_journal_path(hero['name'], save_dir))
+    assert len(character_manager._saved_state) == 4
+    assert character_manager.load_character("Tracked0", save_dir) == heroes[0]
+
+def test_bulk_character_operations(tmp_path):
+    """Test that bulk updates apply every operation and save in one batch"""
+    save_dir = str(tmp_path)
+    names = [f"BulkHero{i}" for i in range(5)]
+    heroes = [character_manager.create_character(name, "Cleric") for name in names]
+    heroes[0]['health'] = 0
+    heroes[1]['gold'] = 0
+    character_manager.save_characters(heroes, save_dir)
+
+    result = character_manager.bulk_update_characters(
+        names + ["MissingHero"],
+        [("revive",), ("add_gold", -50), ("gain_experience", 100)],
+        save_dir
+    )
+
+    # BulkHero1 can't afford the gold, MissingHero has no save
+    assert result['updated'] == 4
+    assert sorted(result['failed']) == ["BulkHero1", "MissingHero"]
+    assert result['characters_per_second'] > 0
+
+    revived = character_manager.load_character("BulkHero0", save_dir)
+    assert revived['level'] == 2 and revived['gold'] == 50
+    assert revived['health'] == revived['max_health']
+    assert character_manager.load_character("BulkHero1", save_dir) == heroes[1]
+
+    with pytest.raises(ValueError):
+        character_manager.bulk_update_characters(names, [("teleport",)], save_dir)
+    for bad_operation in [("add_gold",), ("add_gold", 1, 2), ("revive", 5)]:
+        with pytest.raises(ValueError):
+            character_manager.bulk_update_characters(names, [bad_operation], save_dir)
+
+    # A bad argument type is reported per character, not raised
+    result = character_manager.bulk_update_characters(names[:2], [("add_gold", "10")], save_dir)
+    assert result['updated'] == 0 and sorted(result['failed']) == names[:2]
+
 def test_character_leveling_system():
     """Test that character leveling works correctly"""
     char = character_manager.create_character("LevelTest", "Mage")
@@ -54,6 +445,41 @@ def test_character_leveling_system():
     assert char['max_health'] > original_health
     assert char['health'] == char['max_health']  # Health restored on level up
 
+def _loop_gain_experience(character, xp_amount):
+    """Reference version of gain_experience: one level per pass"""
+    character['experience'] += xp_amount
+    while character['experience'] >= character['level'] * 100:
+        character['experience'] -= character['level'] * 100
+        character['level'] += 1
+        character['max_health'] += 10
+        character['strength'] += 2
+        character['magic'] += 2
+        character['health'] = character['max_health']
+    return character
+
+def test_closed_form_leveling_matches_loop():
+    """Test that multi-level XP gains match leveling one level at a time"""
+    import random
+    rng = random.Random(163)
+
+    for _ in range(500):
+        char = character_manager.create_character("XPTest", rng.choice(["Warrior", "Mage", "Rogue", "Cleric"]))
+        char['level'] = rng.randint(1, 40)
+        char['experience'] = rng.randint(0, char['level'] * 100 - 1)
+        char['health'] = rng.randint(1, char['max_health'])
+        xp = rng.choice([0, 1, rng.randint(0, 500), rng.randint(0, 100000)])
+
+        expected = _loop_gain_experience(dict(char), xp)
+        character_manager.gain_experience(char, xp)
+        assert dict(char) == expected
+
+    # The cumulative table agrees with the per-level requirement
+    table = character_manager.get_cumulative_xp_table(150)
+    assert table[1] == 0
+    assert all(table[n + 1] - table[n] == n * 100 for n in range(1, 150))
+    assert character_manager.level_for_total_xp(table[20] + 5) == (20, 5)
+    assert character_manager.level_for_total_xp(table[20] - 1) == (19, 1899)
+
 def test_character_gold_management():
     """Test adding and spending gold"""
     char = character_manager.create_character("GoldTest", "Rogue")
@@ -89,6 +515,70 @@ def test_inventory_item_management():
     assert "health_potion" not in char['inventory']  # Consumed
     assert char['health'] == 70  # Healed
 
+def test_counter_backed_inventory(tmp_path):
+    """Test that the Inventory type keeps counts and saves as a plain list"""
+    char = character_manager.create_character("StackTest", "Rogue")
+    assert isinstance(char['inventory'], inventory_system.Inventory)
+
+    inventory_system.add_item_to_inventory(char, "health_potion")
+    inventory_system.add_item_to_inventory(char, "iron_sword")
+    inventory_system.add_item_to_inventory(char, "health_potion")
+    assert inventory_system.count_item(char, "health_potion") == 2
+    assert inventory_system.get_inventory_space_remaining(char) == inventory_system.MAX_INVENTORY_SIZE - 3
+
+    # Grouped by item, compared like a bag against plain lists
+    assert list(char['inventory']) == ["health_potion", "health_potion", "iron_sword"]
+    assert char['inventory'] == ["iron_sword", "health_potion", "health_potion"]
+
+    # Indexing walks the stacks; slices still give the flat list
+    inventory = char['inventory']
+    assert [inventory[i] for i in range(len(inventory))] == inventory[:]
+    assert inventory[-1] == "iron_sword"
+    with pytest.raises(IndexError):
+        inventory[3]
+
+    inventory_system.remove_item_from_inventory(char, "health_potion")
+    assert inventory_system.has_item(char, "health_potion")
+    character_manager.save_character(char, str(tmp_path))
+    with open(character_manager.get_save_path("StackTest", str(tmp_path))) as f:
+        assert "INVENTORY: health_potion,iron_sword\n" in f.read()
+
+    # Assigning a list converts it
+    char['inventory'] = ["torch"] * 3
+    assert char['inventory'].count("torch") == 3
+    assert inventory_system.clear_inventory(char) == ["torch"] * 3 and len(char['inventory']) == 0
+
+def test_stackable_items_and_quantities():
+    """Test that stacks share inventory slots and quantity APIs work in bulk"""
+    items = game_data.load_items("data/items.txt", use_cache=False)
+    assert items['health_potion']['max_stack'] == 20
+    assert items['iron_sword']['max_stack'] == 1
+
+    char = character_manager.create_character("StackBuyer", "Warrior")
+    char['gold'] = 10000
+    inventory_system.purchase_item(char, 'health_potion', items['health_potion'], qty=25)
+    inventory_system.purchase_item(char, 'iron_sword', items['iron_sword'])
+
+    # 25 potions fill two stacks, the sword takes a third slot
+    assert inventory_system.count_item(char, 'health_potion') == 25
+    assert inventory_system.get_slots_used(char) == 3
+    assert char['gold'] == 10000 - 25 * 25 - 100
+
+    char['health'] = 30
+    result = inventory_system.use_item(char, 'health_potion', items['health_potion'], qty=5)
+    assert "5 x Health Potion" in result and "+100 health" in result
+    assert char['health'] == char['max_health']
+    assert inventory_system.get_slots_used(char) == 2
+
+    assert inventory_system.sell_item(char, 'health_potion', items['health_potion'], qty=20) == 240
+    assert 'health_potion' not in char['inventory']
+
+    # Stack sizes aren't saved, set_stack_limits restores them after a load
+    reloaded = character_manager.Character(dict(char, inventory=['health_potion'] * 30))
+    assert inventory_system.get_slots_used(reloaded) == 30
+    inventory_system.set_stack_limits(reloaded, items)
+    assert inventory_system.get_slots_used(reloaded) == 2
+
 def test_equipment_system():
     """Test equipping weapons and armor"""
     char = character_manager.create_character("EquipTest", "Warrior")
@@ -104,6 +594,95 @@ def test_equipment_system():
     assert 'equipped_weapon' in char
     assert char['equipped_weapon'] == "iron_sword"
 
+def test_equipment_stat_layers_never_drift(tmp_path):
+    """Test that equip/unequip/buffs stack as layers and saves keep base stats"""
+    char = character_manager.create_character("LayerTest", "Warrior")
+    base = inventory_system.get_base_stats(char)
+    sword = {'type': 'weapon', 'name': 'Sword', 'effect': 'strength:5'}
+    blade = {'type': 'weapon', 'name': 'Blade', 'effect': 'strength:9,magic:1'}
+    mail = {'type': 'armor', 'name': 'Mail', 'effect': 'max_health:30'}
+    char['inventory'] = ['sword', 'blade', 'mail']
+
+    inventory_system.equip_weapon(char, 'sword', sword)
+    inventory_system.equip_armor(char, 'mail', mail)
+    inventory_system.equip_weapon(char, 'blade', blade)
+    inventory_system.add_stat_buff(char, 'rage', (('strength', 4),))
+    assert char['strength'] == base['strength'] + 9 + 4
+    assert char['magic'] == base['magic'] + 1
+    assert char['max_health'] == base['max_health'] + 30
+    assert inventory_system.get_base_stats(char) == base
+
+    # Level-ups change the base underneath the layers
+    character_manager.gain_experience(char, 100)
+    assert char['strength'] == base['strength'] + 2 + 9 + 4
+
+    # Saves hold base stats only
+    character_manager.save_character(char, str(tmp_path))
+    saved = character_manager.load_character("LayerTest", str(tmp_path))
+    assert saved['strength'] == base['strength'] + 2
+    assert saved['max_health'] == base['max_health'] + 10
+
+    # Equipped items are saved back in the inventory, in both formats and
+    # in the journal
+    assert sorted(saved['inventory']) == ['blade', 'mail', 'sword']
+    assert character_manager.save_character_incremental(char, str(tmp_path)) == False
+    character_manager.save_character(char, str(tmp_path), save_format="binary")
+    assert sorted(character_manager.load_character("LayerTest", str(tmp_path))['inventory']) == [
+        'blade', 'mail', 'sword']
+
+    # Taking everything off lands exactly on the base stats again
+    inventory_system.clear_stat_buffs(char)
+    inventory_system.unequip_weapon(char)
+    inventory_system.unequip_armor(char)
+    assert inventory_system.get_base_stats(char) == {
+        stat: char[stat] for stat in inventory_system.LAYERED_STATS}
+    assert char['strength'] == saved['strength'] and char['max_health'] == saved['max_health']
+    assert sorted(char['inventory']) == ['blade', 'mail', 'sword']
+
+    # Unequipping after the save is no change to what's on disk
+    assert character_manager.save_character_incremental(char, str(tmp_path)) == False
+
+def test_equipment_health_effect_is_taken_back(tmp_path):
+    """Test that gear with a health effect doesn't heal on every equip cycle"""
+    char = character_manager.create_character("HealthGear", "Warrior")
+    vest = {'type': 'armor', 'name': 'Vest', 'effect': 'max_health:10,health:15'}
+    char['inventory'] = ['vest']
+    char['health'] = 40
+
+    for _ in range(3):
+        inventory_system.equip_armor(char, 'vest', vest)
+        assert char['health'] == 55
+        inventory_system.unequip_armor(char)
+        assert char['health'] == 40
+
+    # Saved like an unequip: the vest goes back in the bag, its health too
+    inventory_system.equip_armor(char, 'vest', vest)
+    character_manager.save_character(char, str(tmp_path))
+    saved = character_manager.load_character("HealthGear", str(tmp_path))
+    assert saved['health'] == 40 and saved['inventory'] == ['vest']
+
+    # Taking it off can't kill
+    char['health'] = 5
+    inventory_system.unequip_armor(char)
+    assert char['health'] == 1
+
+def test_preparsed_multi_effect_items():
+    """Test that loaded items carry parsed effects and multi-effect items apply fully"""
+    items = game_data.load_items("data/items.txt")
+    assert items['iron_sword']['effects'] == (('strength', 5),)
+
+    char = character_manager.create_character("EffectTest", "Mage")
+    original_strength = char['strength']
+    original_magic = char['magic']
+
+    tonic = {'type': 'consumable', 'name': 'Tonic', 'effect': 'strength:2,magic:3'}
+    inventory_system.add_item_to_inventory(char, "tonic")
+    result = inventory_system.use_item(char, "tonic", tonic)
+
+    assert char['strength'] == original_strength + 2
+    assert char['magic'] == original_magic + 3
+    assert "+2 strength, +3 magic" in result
+
 def test_shop_system():
     """Test buying and selling items"""
     char = character_manager.create_character("ShopTest", "Mage")
@@ -123,6 +702,64 @@ def test_shop_system():
     assert gold_received == 12  # Half of cost (25 // 2)
     assert "health_potion" not in char['inventory']
 
+def test_shop_cart_checkout():
+    """Test that a cart applies all buys and sells together, or none"""
+    from custom_exceptions import InsufficientResourcesError
+
+    items = game_data.load_items("data/items.txt")
+    char = character_manager.create_character("CartTest", "Rogue")
+    char['inventory'] = ['iron_sword', 'iron_sword']
+    char['gold'] = 0
+
+    # Selling two swords (50 each) pays for the potions
+    cart = inventory_system.Cart(items)
+    cart.sell('iron_sword', 2)
+    cart.buy('health_potion', 4)
+    assert cart.totals() == (100, 100)
+
+    receipt = cart.checkout(char)
+    assert receipt['gold'] == 0 and receipt['spent'] == 100
+    assert char['inventory'] == ['health_potion'] * 4
+    assert not cart.buys and not cart.sells
+
+    # One unaffordable line cancels the whole cart
+    cart.sell('health_potion', 4)
+    cart.buy('steel_sword')
+    with pytest.raises(InsufficientResourcesError):
+        cart.checkout(char)
+    assert char['inventory'] == ['health_potion'] * 4 and char['gold'] == 0
+
+def test_shop_index_paginated_queries():
+    """Test filtered, sorted and paginated shop queries against a full scan"""
+    items = {}
+    for i in range(95):
+        item_type = ("weapon", "armor", "consumable")[i % 3]
+        stat = ("strength", "magic", "max_health")[i % 3]
+        items[f"item_{i}"] = {'name': f"Item {i}", 'type': item_type,
+                              'effect': f"{stat}:{i % 7 + 1}", 'cost': (i * 37) % 500}
+    index = inventory_system.ShopIndex(items, page_size=10)
+
+    def scan(item_type=None, max_cost=None):
+        matches = [item_id for item_id, item in items.items()
+                   if (item_type is None or item['type'] == item_type)
+                   and (max_cost is None or item['cost'] <= max_cost)]
+        return sorted(matches, key=lambda item_id: (items[item_id]['cost'], item_id))
+
+    # Walking every page gives the same listing as a full scan
+    first = index.query()
+    assert first['total'] == 95 and first['pages'] == 10
+    pages = [index.query(page=n)['items'] for n in range(1, 11)]
+    assert sum(pages, []) == scan()
+
+    weapons = index.query(item_type="weapon", max_cost=250, descending=True, page_size=100)
+    assert weapons['items'] == scan("weapon", 250)[::-1]
+
+    char = {'gold': 120}
+    assert index.affordable(char, page_size=100)['items'] == scan(max_cost=120)
+
+    best = index.query(stat="strength", sort_by="strength", descending=True, page_size=3)
+    assert [index.bonuses[item_id]['strength'] for item_id in best['items']] == [7, 7, 7]
+
 # ============================================================================
 # QUEST INTEGRATION TESTS
 # ============================================================================
@@ -274,6 +911,133 @@ def test_data_validation():
     
     assert game_data.validate_item_data(valid_item) == True
 
+def test_compiled_data_cache(tmp_path):
+    """Test that loaders reuse a fresh cache and rebuild a stale one"""
+    item_file = tmp_path / "items.txt"
+    item_file.write_text(
+        "ITEM_ID: test_potion\nNAME: Test Potion\nTYPE: consumable\n"
+        "EFFECT: health:20\nCOST: 25\nDESCRIPTION: Test\n"
+    )
+
+    items = game_data.load_items(str(item_file))
+    assert os.path.exists(game_data.get_cache_path(str(item_file)))
+    assert game_data.load_items(str(item_file)) == items
+
+    # Changing the source must invalidate the cache
+    item_file.write_text(
+        "ITEM_ID: test_potion\nNAME: Test Potion\nTYPE: consumable\n"
+        "EFFECT: health:30\nCOST: 40\nDESCRIPTION: Test\n"
+    )
+    reloaded = game_data.load_items(str(item_file))
+    assert reloaded['test_potion']['cost'] == 40
+    assert reloaded == game_data.load_items(str(item_file), use_cache=False)
+
+def test_streaming_data_iterators():
+    """Test that iter_quests/iter_items yield the same records as the loaders"""
+    quests = list(game_data.iter_quests("data/quests.txt"))
+    items = list(game_data.iter_items("data/items.txt"))
+
+    assert {q['quest_id']: q for q in quests} == game_data.load_quests("data/quests.txt", use_cache=False)
+    assert {i['item_id']: i for i in items} == game_data.load_items("data/items.txt", use_cache=False)
+
+def test_item_catalog_lazy_decoding():
+    """Test that ItemCatalog decodes items on demand and matches load_items"""
+    items = game_data.load_items("data/items.txt", use_cache=False)
+
+    with game_data.ItemCatalog("data/items.txt") as catalog:
+        assert len(catalog) == len(items)
+        assert set(catalog) == set(items)
+        assert catalog.decoded_count() == 0
+
+        assert catalog['iron_sword'] == items['iron_sword']
+        assert catalog.decoded_count() == 1
+        assert 'missing_item' not in catalog
+
+def test_content_pack_loading(tmp_path):
+    """Test that content packs merge and duplicate IDs are rejected"""
+    from custom_exceptions import InvalidDataFormatError
+
+    block = "QUEST_ID: {0}\nTITLE: T\nDESCRIPTION: D\nREWARD_XP: 10\nREWARD_GOLD: 5\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n"
+    (tmp_path / "north.txt").write_text(block.format("north_quest"))
+    (tmp_path / "south.txt").write_text(block.format("south_quest"))
+
+    quests, timings = game_data.load_content_packs(str(tmp_path), kind="quests", max_workers=2)
+    assert set(quests) == {"north_quest", "south_quest"}
+    assert len(timings) == 2
+
+    (tmp_path / "west.txt").write_text(block.format("north_quest"))
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_content_packs(str(tmp_path / "*.txt"), kind="quests", max_workers=1)
+
+    (tmp_path / "west.txt").unlink()
+    (tmp_path / "east.txt").write_text(block.format("east_quest") + "\n" + block.format("east_quest"))
+    with pytest.raises(InvalidDataFormatError, match="line 9"):
+        game_data.load_content_packs(str(tmp_path), kind="quests", max_workers=1)
+
+def test_catalog_watcher_hot_reload(tmp_path):
+    """Test that the watcher reparses only changed blocks and keeps old data on errors"""
+    block = "ITEM_ID: {0}\nNAME: N\nTYPE: consumable\nEFFECT: health:{1}\nCOST: 10\nDESCRIPTION: D\n"
+    item_file = tmp_path / "items.txt"
+    item_file.write_text(block.format("potion_a", 10) + "\n" + block.format("potion_b", 10))
+
+    watcher = game_data.CatalogWatcher(str(item_file), "items")
+    old_records = watcher.records
+    assert watcher.poll() == False
+
+    item_file.write_text(block.format("potion_a", 10) + "\n" + block.format("potion_b", 99))
+    os.utime(item_file, ns=(0, 1))
+    assert watcher.poll() == True
+    assert watcher.version == 2
+    assert watcher.records['potion_b']['effect'] == "health:99"
+    assert watcher.records['potion_a'] is old_records['potion_a']  # not reparsed
+
+    item_file.write_text("broken data")
+    assert watcher.poll() == False
+    assert watcher.last_error is not None
+    assert watcher.records['potion_b']['effect'] == "health:99"
+
+    # A duplicate ID is rejected like load_items does, old version stays
+    item_file.write_text(block.format("potion_a", 10) + "\n" + block.format("potion_a", 50))
+    assert watcher.poll() == False
+    assert "line 8" in str(watcher.last_error)
+    assert watcher.records['potion_a']['effect'] == "health:10"
+    assert watcher.version == 2
+
+def test_validate_catalog_reports_all_errors(tmp_path):
+    """Test that catalog validation reports every bad record with its line number"""
+    item_file = tmp_path / "items.txt"
+    item_file.write_text(
+        "ITEM_ID: good\nNAME: Good\nTYPE: weapon\nEFFECT: strength:5\nCOST: 10\nDESCRIPTION: D\n\n"
+        "ITEM_ID: bad_type\nNAME: Bad\nTYPE: shield\nEFFECT: strength:5\nCOST: 10\nDESCRIPTION: D\n\n"
+        "ITEM_ID: bad_effect\nNAME: Bad\nTYPE: armor\nEFFECT: luck:5\nCOST: 10\nDESCRIPTION: D\n"
+    )
+
+    errors = game_data.validate_catalog(str(item_file), "items")
+
+    assert [line for line, message in errors] == [10, 18]
+    assert "shield" in errors[0][1]
+    assert game_data.validate_catalog("data/items.txt", "items") == []
+
+def test_item_table_queries():
+    """Test columnar item queries against the shipped item catalog"""
+    items = game_data.load_items("data/items.txt")
+    table = game_data.ItemTable(items)
+
+    assert len(table) == len(items)
+    assert table.get_cost('iron_sword') == items['iron_sword']['cost']
+    assert table.get_bonus('iron_sword', 'strength') == 5
+
+    cheap_weapons = table.select(item_type="weapon", max_cost=200,
+                                 sort_by="strength", descending=True)
+    assert cheap_weapons == ['iron_sword', 'fire_staff']
+    assert table.select(stat="max_health", sort_by="cost") == ['leather_armor', 'steel_armor']
+
+    # Costs past 32 bits are valid item data and must fit the columns
+    items = dict(items, relic={'type': 'armor', 'cost': 2**40, 'effect': 'max_health:1'})
+    table = game_data.ItemTable(items)
+    assert table.get_cost('relic') == 2**40
+    assert table.select(item_type="armor", min_cost=2**32) == ['relic']
+
 # ============================================================================
 # FULL GAME WORKFLOW TEST
 # ============================================================================